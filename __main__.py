@@ -1,4 +1,6 @@
 import argparse
+import logging
+import os
 from pathlib import Path
 
 from engine import crawl
@@ -12,7 +14,24 @@ def main():
         metavar="N",
         help="Run in test mode with a limit of N links.",
     )
+    parser.add_argument("--base-url", help="Site to crawl; without it no pages are fetched.")
+    parser.add_argument("--sections", help="File listing the sections to crawl.")
+    parser.add_argument(
+        "--user",
+        default=os.environ.get("SS_CANTON_USER"),
+        help="Login user (default: $SS_CANTON_USER).",
+    )
+    parser.add_argument(
+        "--password",
+        default=os.environ.get("SS_CANTON_PASSWORD"),
+        help="Login password (default: $SS_CANTON_PASSWORD).",
+    )
+    parser.add_argument("--max-workers", type=int, default=4, help="Page and extraction threads.")
     args = parser.parse_args()
+    if args.base_url and not args.sections:
+        parser.error("--base-url requires --sections")
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
 
     output_dir = Path("output")
     max_links = None
@@ -21,7 +40,15 @@ def main():
         output_dir = Path("test_results") / output_dir
         print(f"[TEST MODE] max_links={max_links}, output -> {output_dir}")
 
-    crawl(max_links=max_links, output_dir=output_dir)
+    crawl(
+        max_links=max_links,
+        output_dir=output_dir,
+        base_url=args.base_url,
+        sections_file=args.sections,
+        username=args.user,
+        password=args.password,
+        max_workers=args.max_workers,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Benchmarks for the crawler and extraction pipeline."""
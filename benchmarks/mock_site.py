@@ -0,0 +1,223 @@
+"""Generated SS Canton-like site served from a local HTTP server.
+
+The site is deterministic for a given size and seed.
+- ``/elcanton/`` is the login endpoint: a ``POST`` sets the session cookie.
+  Without that cookie every page redirects to ``/elcanton/login``.
+- Each section page (``/novedades``, ``/noticias``, ``/avisos``) links to
+  one article, and every article links to ``fanout`` further ones, so the
+  articles form one tree per section.
+- Article pages rotate between the three layouts that
+  :func:`extract_contenido.find_target_region` knows: ``table.contenido``,
+  ``div#news-body`` and ``div.novedadespop_mensaje``. Every page carries the
+  ``novedadespop_*`` date and title markup.
+- ``/docs/doc-<n>.pdf`` are the attachments linked from the articles.
+
+:class:`MockServer` runs the server in a child process, so the CPU time and
+memory of the benchmark process only account for the crawler.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from .region_extraction import build_page
+
+SECTIONS = ("novedades", "noticias", "avisos")
+LOGIN_PATH = "/elcanton/"
+LOGIN_PAGE_PATH = "/elcanton/login"
+COOKIE = "PHPSESSID=benchmark"
+
+
+class MockSite:
+    """In-memory content of the generated site.
+
+    Parameters
+    ----------
+    pages:
+        Number of article pages.
+    attachments:
+        Number of distinct PDF attachments.
+    fanout:
+        Links from each page to further articles.
+    attachment_kib:
+        Size of each attachment in KiB.
+    seed:
+        Seed for the generated text and link layout.
+    """
+
+    def __init__(
+        self,
+        pages: int = 300,
+        attachments: int = 30,
+        fanout: int = 4,
+        attachment_kib: int = 64,
+        seed: int = 0,
+    ) -> None:
+        self.pages = pages
+        self.attachments = attachments
+        self.fanout = fanout
+        self.attachment_kib = attachment_kib
+        self.seed = seed
+        rng = random.Random(seed)
+        self._paragraphs = [rng.randint(5, 60) for _ in range(pages)]
+
+    def sections_text(self) -> str:
+        """Return a sections file listing every section."""
+
+        return "".join(f"{name}\n" for name in SECTIONS)
+
+    def article_paths(self) -> List[str]:
+        return [f"/nota/{i}" for i in range(self.pages)]
+
+    def attachment_paths(self) -> List[str]:
+        return [f"/docs/doc-{i}.pdf" for i in range(self.attachments)]
+
+    def _children(self, index: int) -> List[int]:
+        first = index * self.fanout + len(SECTIONS)
+        return [i for i in range(first, first + self.fanout) if i < self.pages]
+
+    def _links(self, targets: List[int], index: int) -> str:
+        links = "".join(f"<a href='/nota/{i}'>Nota {i}</a> " for i in targets)
+        if self.attachments:
+            links += f"<a href='/docs/doc-{index % self.attachments}.pdf'>Adjunto</a>"
+        return f"<div class='menu'><a href='/novedades'>Inicio</a></div><p>{links}</p>"
+
+    def section(self, name: str) -> str:
+        # Section i links to article i, the root of its subtree.
+        index = SECTIONS.index(name)
+        roots = [index] if index < self.pages else []
+        return (
+            f"<html><head><title>{name}</title></head><body>"
+            f"<table class='contenido'><tr><td>Sección {name}</td></tr></table>"
+            f"{self._links(roots, index)}</body></html>"
+        )
+
+    def article(self, index: int) -> str:
+        paragraphs = self._paragraphs[index]
+        links = self._links(self._children(index), index)
+        header = (
+            f"<table><tr><td class='novedadespop_fecha'>Lunes {index % 28 + 1} de Enero de 2024</td></tr></table>"
+            f"<div class='novedadespop_titulo'>Nota {index}</div>"
+        )
+        layout = index % 3
+        if layout == 0:
+            page = build_page(paragraphs)
+            return page.replace("<body>", f"<body>{links}", 1)
+        body = "".join(f"<p>Párrafo {index}-{i} con <strong>texto</strong> de ejemplo.</p>" for i in range(paragraphs))
+        if layout == 1:
+            region = f"<div id='news-body'>{body}</div>"
+        else:
+            region = f"<div class='novedadespop_mensaje'>{body}</div>"
+        return f"<html><head><title>Nota {index}</title></head><body>{header}{region}{links}</body></html>"
+
+    def attachment(self, index: int) -> bytes:
+        rng = random.Random(self.seed * 100003 + index)
+        return b"%PDF-1.4\n" + rng.randbytes(self.attachment_kib * 1024)
+
+    def resolve(self, path: str) -> Optional[Tuple[str, bytes]]:
+        """Return ``(content type, body)`` for *path* or ``None``."""
+
+        name = path.strip("/")
+        if name in SECTIONS:
+            return "text/html; charset=utf-8", self.section(name).encode("utf-8")
+        if path.startswith("/nota/"):
+            index = int(path.rsplit("/", 1)[1])
+            if 0 <= index < self.pages:
+                return "text/html; charset=utf-8", self.article(index).encode("utf-8")
+        if path.startswith("/docs/doc-") and path.endswith(".pdf"):
+            index = int(path[len("/docs/doc-"):-len(".pdf")])
+            if 0 <= index < self.attachments:
+                return "application/pdf", self.attachment(index)
+        return None
+
+
+def make_handler(site: MockSite, latency: float = 0.0) -> type:
+    """Return a request handler class serving *site*, sleeping *latency* seconds per request."""
+
+    cache: Dict[str, Optional[Tuple[str, bytes]]] = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes; with Nagle's algorithm the
+        # body would wait for the client's delayed ACK on every keep-alive
+        # request.
+        disable_nagle_algorithm = True
+
+        def do_POST(self) -> None:
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path != LOGIN_PATH:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Set-Cookie", f"{COOKIE}; Path=/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self) -> None:
+            if latency:
+                time.sleep(latency)
+            if self.path == LOGIN_PAGE_PATH:
+                self._reply("text/html; charset=utf-8", b"<form method='post'>login</form>")
+                return
+            if COOKIE not in (self.headers.get("Cookie") or ""):
+                self.send_response(302)
+                self.send_header("Location", LOGIN_PAGE_PATH)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if self.path not in cache:
+                cache[self.path] = site.resolve(self.path)
+            found = cache[self.path]
+            if found is None:
+                self.send_error(404)
+                return
+            self._reply(*found)
+
+        def _reply(self, ctype: str, body: bytes) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    return Handler
+
+
+def _serve(site: MockSite, latency: float, conn) -> None:  # pragma: no cover - runs in the child
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(site, latency))
+    httpd.daemon_threads = True
+    conn.send(httpd.server_port)
+    httpd.serve_forever()
+
+
+class MockServer:
+    """Serve a :class:`MockSite` from a child process.
+
+    Use as a context manager; :attr:`base_url` is available inside the
+    block.
+    """
+
+    def __init__(self, site: MockSite, latency: float = 0.0) -> None:
+        self.site = site
+        self.latency = latency
+        self.base_url = ""
+        self._process: Optional[multiprocessing.Process] = None
+
+    def __enter__(self) -> "MockServer":
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve, args=(self.site, self.latency, child), daemon=True)
+        self._process.start()
+        port = parent.recv()
+        self.base_url = f"http://127.0.0.1:{port}/"
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
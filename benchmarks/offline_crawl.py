@@ -0,0 +1,207 @@
+"""Measure crawl, download and extraction throughput against a local mock site.
+
+Run from the repository root::
+
+    python -m benchmarks.offline_crawl [--pages 300] [--attachments 30] [--workers 8] [--latency 0.005]
+
+A :class:`benchmarks.mock_site.MockServer` serves the generated site from a
+child process. After logging in through its login endpoint the script runs,
+in order:
+
+``crawl``
+    :func:`crawler.runner.run` over every section, storing the pages.
+``download``
+    :func:`crawler.downloads.download_file` for every attachment.
+``extract``
+    :func:`extract_contenido.main` over the stored HTML.
+
+For each stage it reports items per second, the p50/p99 latency of its
+HTTP requests, the CPU time of this process and its peak resident set size
+so far. ``--json`` also writes the
+numbers to a file for comparison between runs.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - resource is Unix only
+    resource = None
+
+import extract_contenido
+from crawler.auth import AuthSession
+from crawler.downloads import download_file
+from crawler.runner import run as run_crawl
+from crawler.scope import LinkFilter
+from crawler.session import make_session
+
+from .mock_site import LOGIN_PAGE_PATH, LOGIN_PATH, MockServer, MockSite
+
+
+class TimedSession:
+    """Record the duration of every ``get`` made through a wrapped session."""
+
+    def __init__(self, session: Any) -> None:
+        self.session = session
+        self.latencies: List[float] = []
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return self.session.get(url, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies.append(elapsed)
+
+    def reset(self) -> List[float]:
+        with self._lock:
+            latencies, self.latencies = self.latencies, []
+        return latencies
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the *q*-th percentile (0-100) of *values* by nearest rank."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(q / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def peak_rss_mib() -> Optional[float]:
+    """Return the peak resident set size of this process in MiB, if known."""
+
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Stage:
+    """Time a benchmark stage: wall clock, CPU time and latency percentiles."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.result: Dict[str, Any] = {}
+
+    def __enter__(self) -> "Stage":
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.wall = time.perf_counter() - self._wall
+        self.cpu = time.process_time() - self._cpu
+
+    def finish(self, items: int, latencies: Optional[List[float]] = None) -> Dict[str, Any]:
+        self.result = {
+            "stage": self.name,
+            "items": items,
+            "seconds": round(self.wall, 3),
+            "items_per_second": round(items / self.wall, 1) if self.wall > 0 else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+            "cpu_seconds": round(self.cpu, 3),
+            "peak_rss_mib": round(peak_rss_mib() or 0.0, 1),
+        }
+        return self.result
+
+
+def run_benchmark(site: MockSite, workers: int, latency: float, workdir: Path) -> List[Dict[str, Any]]:
+    """Run every stage against *site* and return one result per stage."""
+
+    results: List[Dict[str, Any]] = []
+    with MockServer(site, latency=latency) as server:
+        base_url = server.base_url
+        session = TimedSession(
+            AuthSession(
+                "benchmark",
+                "benchmark",
+                session=make_session(workers),
+                login_url=base_url.rstrip("/") + LOGIN_PATH,
+                login_page=base_url.rstrip("/") + LOGIN_PAGE_PATH,
+            ).start()
+        )
+        sections = workdir / "sections.txt"
+        sections.write_text(site.sections_text(), encoding="utf-8")
+        pages_dir = workdir / "pages"
+
+        with Stage("crawl") as stage:
+            run_crawl(
+                base_url,
+                str(sections),
+                max_workers=workers,
+                session=session,
+                output_dir=pages_dir,
+                link_filter=LinkFilter.for_site(base_url, str(sections)),
+            )
+        html_files = list((pages_dir / "html").glob("*.html"))
+        results.append(stage.finish(len(html_files), session.reset()))
+
+        counter: Dict[str, int] = {}
+        with Stage("download") as stage:
+            for path in site.attachment_paths():
+                download_file(session, base_url.rstrip("/") + path, "adjunto", str(workdir / "documentos"), counter)
+        results.append(stage.finish(site.attachments, session.reset()))
+
+    with Stage("extract") as stage:
+        extract_contenido.main([
+            "--in", str(pages_dir / "html"),
+            "--out-file", str(workdir / "contenido.jsonl"),
+            "--format", "jsonl",
+            "--workers", str(workers),
+        ])
+    results.append(stage.finish(len(html_files)))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300, help="article pages in the generated site")
+    parser.add_argument("--attachments", type=int, default=30, help="PDF attachments in the generated site")
+    parser.add_argument("--attachment-kib", type=int, default=64, help="size of each attachment")
+    parser.add_argument("--fanout", type=int, default=4, help="links from each page to further pages")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="crawler and extraction threads")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the server waits before each reply")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args(argv)
+    # Per-page log lines would dominate the output and the timings.
+    logging.getLogger("extract_contenido").setLevel(logging.WARNING)
+    logging.getLogger("crawler").setLevel(logging.WARNING)
+
+    site = MockSite(args.pages, args.attachments, args.fanout, args.attachment_kib, args.seed)
+    with tempfile.TemporaryDirectory(prefix="ss-canton-bench-") as tmp:
+        results = run_benchmark(site, args.workers, args.latency, Path(tmp))
+
+    print(f"{'stage':<10} {'items':>6} {'s':>8} {'items/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'cpu s':>7} {'rss MiB':>8}")
+    for r in results:
+        print(
+            f"{r['stage']:<10} {r['items']:>6} {r['seconds']:>8.3f} {r['items_per_second']:>9.1f} "
+            f"{_ms(r['p50_ms'])} {_ms(r['p99_ms'])} {r['cpu_seconds']:>7.3f} {r['peak_rss_mib']:>8.1f}"
+        )
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value:>8.2f}" if value is not None else f"{'-':>8}"
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
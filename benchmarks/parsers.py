@@ -0,0 +1,149 @@
+"""Time the HTML parsers over a synthetic corpus and check their output.
+
+Run from the repository root::
+
+    python -m benchmarks.parsers [--repeat 5] [--page contenido-2000 ...] [--update-golden]
+
+The corpus (see :func:`corpus`) has ``table.contenido`` pages of growing
+size and pages that hit every :func:`extract_contenido.find_target_region`
+fallback. For each page and each parser entry point in :data:`FUNCTIONS`
+the script reports the best time per call over ``--repeat`` runs and the
+peak memory allocated by one call (:mod:`tracemalloc`). It also compares a
+digest of every output with ``benchmarks/golden/parsers.json`` and exits
+with status 1 on a mismatch, so an optimisation that changes the output is
+caught next to its timings. ``--update-golden`` rewrites the file after an
+intended change.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import time
+import tracemalloc
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import extract_contenido
+from crawler import parser as crawler_parser
+from ss_canton_crawler import parser as ss_parser
+
+from .mock_site import MockSite
+from .region_extraction import SAMPLE, build_page
+
+GOLDEN = Path(__file__).resolve().parent / "golden" / "parsers.json"
+
+SIZES = (20, 200, 2000)
+
+FUNCTIONS: Dict[str, Callable[[str], Any]] = {
+    "crawler.extract_text[lxml]": lambda html: crawler_parser.extract_text(html, backend="lxml"),
+    "crawler.extract_text[html.parser]": lambda html: crawler_parser.extract_text(html, backend="html.parser"),
+    "ss_canton.parse_content": ss_parser.parse_content,
+    "extract_contenido.extract_text": lambda html: asdict(extract_contenido.extract_text(html)),
+}
+
+
+def _largest_page() -> str:
+    columns = "".join(
+        f"<div class='col'>{'<p>Columna {0} texto.</p>'.format(i) * (i + 1)}</div>" for i in range(4)
+    )
+    return (
+        "<html><head><title>Sin región</title><script>var x = '<p>no</p>';</script></head><body>"
+        "<div class='menu'><a href='/a'>Inicio</a> | <a href='/b'>Contacto</a></div>"
+        f"<section>{columns}</section>"
+        "<table><tr><td>Pie &amp; notas&nbsp;finales</td></tr></table></body></html>"
+    )
+
+
+def corpus() -> List[Tuple[str, str]]:
+    """Return the benchmark pages as ``(name, html)`` pairs."""
+
+    site = MockSite(pages=3, attachments=1)
+    pages = [("sample", SAMPLE.read_text(encoding="utf-8"))]
+    pages += [(f"contenido-{n}", build_page(n)) for n in SIZES]
+    pages += [
+        ("news-body", site.article(1)),
+        ("novedadespop_mensaje", site.article(2)),
+        ("largest", _largest_page()),
+        ("empty", ""),
+    ]
+    return pages
+
+
+def digest(output: Any) -> str:
+    data = json.dumps(output, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def outputs(pages: List[Tuple[str, str]]) -> Dict[str, Dict[str, str]]:
+    """Return the output digest of every function on every page."""
+
+    return {name: {label: digest(func(html)) for label, func in FUNCTIONS.items()} for name, html in pages}
+
+
+def load_golden() -> Dict[str, Dict[str, str]]:
+    return json.loads(GOLDEN.read_text(encoding="utf-8"))
+
+
+def mismatches(pages: List[Tuple[str, str]], golden: Dict[str, Dict[str, str]]) -> List[Tuple[str, str]]:
+    """Return the ``(page, function)`` pairs whose output differs from *golden*."""
+
+    current = outputs(pages)
+    return [
+        (name, label)
+        for name, results in current.items()
+        for label, value in results.items()
+        if golden.get(name, {}).get(label) != value
+    ]
+
+
+def measure(func: Callable[[str], Any], html: str, repeat: int) -> Tuple[float, int]:
+    """Return ``(best seconds per call, peak bytes allocated)`` for ``func(html)``."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(html)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--page", action="append", help="only run the named corpus page (repeatable)")
+    parser.add_argument("--update-golden", action="store_true", help="rewrite the golden output digests")
+    args = parser.parse_args(argv)
+
+    pages = corpus()
+    if args.update_golden:
+        GOLDEN.parent.mkdir(parents=True, exist_ok=True)
+        GOLDEN.write_text(json.dumps(outputs(pages), indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Updated {GOLDEN}")
+        return
+    if args.page:
+        pages = [(name, html) for name, html in pages if name in args.page]
+
+    print(f"{'page':<22} {'function':<34} {'KiB in':>7} {'ms/page':>9} {'peak KiB':>9}")
+    for name, html in pages:
+        size = len(html.encode("utf-8")) / 1024
+        for label, func in FUNCTIONS.items():
+            seconds, peak = measure(func, html, args.repeat)
+            print(f"{name:<22} {label:<34} {size:>7.1f} {seconds * 1000:>9.3f} {peak / 1024:>9.1f}")
+
+    failed = mismatches(pages, load_golden())
+    if failed:
+        for name, label in failed:
+            print(f"GOLDEN MISMATCH: {label} on {name}")
+        raise SystemExit(1)
+    print(f"Golden output: {len(pages) * len(FUNCTIONS)} results match")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
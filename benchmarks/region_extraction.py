@@ -0,0 +1,83 @@
+"""Compare copy-based and single-pass region extraction.
+
+Run from the repository root::
+
+    python -m benchmarks.region_extraction [--paragraphs 50 500 5000] [--repeat 20]
+
+For each page size the script reports the mean time per page and the peak
+memory allocated (measured with :mod:`tracemalloc`) by
+:func:`extract_contenido.extract_from_region` and
+:func:`extract_contenido.render_region`, after checking that both produce the
+same output.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, Tag
+
+from extract_contenido import extract_from_region, find_target_region, render_region
+
+SAMPLE = Path(__file__).resolve().parents[1] / "tests" / "data" / "sample_contenido.html"
+
+
+def build_page(paragraphs: int, tables: int = 4) -> str:
+    """Return a ``table.contenido`` page with *paragraphs* split across *tables*."""
+
+    per_table = max(1, paragraphs // tables)
+    blocks: List[str] = []
+    for t in range(tables):
+        rows = "".join(
+            f"<p>Párrafo {t}-{i} con <strong>texto</strong> de ejemplo<br>y salto.</p><p>&nbsp;</p>"
+            for i in range(per_table)
+        )
+        blocks.append(f'<table role="presentation"><tr><td>{rows}</td></tr></table>')
+    return (
+        "<html><body><table><tr><td class='novedadespop_fecha'>Lunes 1 de Enero de 2024</td></tr></table>"
+        "<table class='contenido'><tr><td><div class='novedadespop_titulo'>Título</div>"
+        + "".join(blocks)
+        + "</td></tr></table></body></html>"
+    )
+
+
+def measure(func: Callable[[Tag], Tuple[Optional[str], str]], region: Tag, repeat: int) -> Tuple[float, int]:
+    """Return ``(seconds per call, peak bytes allocated)`` for ``func(region)``."""
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(region)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    func(region)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    pages = [("sample", SAMPLE.read_text(encoding="utf-8"))]
+    pages += [(f"{n} paragraphs", build_page(n)) for n in args.paragraphs]
+
+    print(f"{'page':<18} {'impl':<8} {'ms/page':>10} {'peak KiB':>10}")
+    for name, html in pages:
+        soup = BeautifulSoup(html, "lxml")
+        region, _ = find_target_region(soup)
+        if render_region(region) != extract_from_region(region):
+            raise SystemExit(f"Output mismatch on {name}")
+        for label, func in (("copy", extract_from_region), ("walker", render_region)):
+            seconds, peak = measure(func, region, args.repeat)
+            print(f"{name:<18} {label:<8} {seconds * 1000:>10.3f} {peak / 1024:>10.1f}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -2,6 +2,7 @@
 
 from .logging_config import configure_logging
 from .network import crawl, download_file, login
+from .session import make_session
 from .utils import retry
 
-__all__ = ["configure_logging", "crawl", "download_file", "login", "retry"]
+__all__ = ["configure_logging", "crawl", "download_file", "login", "make_session", "retry"]
@@ -0,0 +1,210 @@
+"""Asyncio crawl engine mirroring :func:`crawler.runner.run`.
+
+Requests are issued with :mod:`aiohttp` so hundreds of pages can be in flight
+on a single thread.  Concurrency is bounded by a semaphore and parsing, which
+is CPU bound, is handed to an executor so it does not stall the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import Executor
+from http.cookies import Morsel
+from pathlib import Path
+from typing import TYPE_CHECKING, Set, Tuple
+from urllib.parse import urldefrag, urljoin
+
+import requests
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:  # pragma: no cover - aiohttp is optional
+    aiohttp = None
+
+from .parser import parse_document
+from .runner import save_page
+from .sections import load_sections
+from .session import DEFAULT_TIMEOUT
+
+if TYPE_CHECKING:
+    from .scope import LinkFilter
+
+logger = logging.getLogger(__name__)
+
+
+def copy_cookies(cookies: requests.cookies.RequestsCookieJar, base_url: str) -> "aiohttp.CookieJar":
+    """Return an :class:`aiohttp.CookieJar` holding *cookies* with their scope.
+
+    Each cookie keeps its domain, path and ``secure`` flag, so it is only
+    sent to the hosts that set it. Cookies without a domain are bound to
+    the host of *base_url*. Must be called with an event loop running.
+    """
+
+    # unsafe=True keeps cookies of sites addressed by IP, such as local mirrors.
+    jar = aiohttp.CookieJar(unsafe=True)
+    for cookie in cookies:
+        if cookie.is_expired():
+            continue
+        morsel: Morsel = Morsel()
+        value = cookie.value or ""
+        morsel.set(cookie.name, value, value)
+        morsel["path"] = cookie.path or "/"
+        if cookie.domain_specified:
+            morsel["domain"] = cookie.domain
+        if cookie.secure:
+            morsel["secure"] = True
+        # Without a domain attribute aiohttp scopes the cookie to the host
+        # of response_url only, as requests does.
+        host = cookie.domain.lstrip(".")
+        origin = URL.build(scheme="https", host=host, path="/") if host else URL(base_url)
+        jar.update_cookies({cookie.name: morsel}, response_url=origin)
+    return jar
+
+
+async def run_async(
+    base_url: str,
+    sections_file: str,
+    max_links: int | None = None,
+    session: requests.Session | None = None,
+    concurrency: int = 50,
+    output_dir: str | Path | None = None,
+    executor: Executor | None = None,
+    link_filter: LinkFilter | None = None,
+    timeout: float | Tuple[float, float] = DEFAULT_TIMEOUT,
+) -> Set[str]:
+    """Crawl the site starting from the sections in *sections_file*.
+
+    Parameters
+    ----------
+    base_url:
+        Base URL of the site to crawl. Section paths will be joined to this
+        value using :func:`urllib.parse.urljoin`.
+    sections_file:
+        Path to a file listing initial sections to crawl.
+    max_links:
+        Optional limit of total links to visit.
+    session:
+        Optional authenticated ``requests.Session`` whose cookies are reused
+        by the asynchronous client (see :func:`copy_cookies`).
+    concurrency:
+        Maximum number of requests in flight at once.
+    output_dir:
+        Optional directory where every fetched page is stored as HTML and
+        cleaned text (see :func:`crawler.runner.save_page`).
+    executor:
+        Executor used for parsing and writing pages. ``None`` uses the event
+        loop's default thread pool; pass a process pool to parse on several
+        cores.
+    link_filter:
+        Optional :class:`~crawler.scope.LinkFilter` applied to discovered
+        links before they are scheduled.
+    timeout:
+        Seconds to wait for a connection and between reads, as a single
+        number or a ``(connect, read)`` pair like ``requests`` accepts.
+
+    Returns
+    -------
+    Set[str]
+        All URLs that were scheduled for fetching.
+    """
+
+    if aiohttp is None:
+        raise RuntimeError("The asyncio engine requires the aiohttp package")
+    if concurrency < 1:
+        raise ValueError("concurrency must be 1 or greater")
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    visited: Set[str] = set()
+    tasks: Set[asyncio.Task] = set()
+    out = Path(output_dir) if output_dir is not None else None
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+
+    def schedule(url: str, section: str, depth: int) -> None:
+        task = asyncio.create_task(fetch(url, section, depth))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def fetch(url: str, section: str, depth: int) -> None:
+        # Like run_workers in crawler.runner: a failing page is logged and
+        # never takes the rest of the crawl down with it.
+        try:
+            await crawl_page(url, section, depth)
+        except Exception:
+            logger.exception("Unhandled error while crawling %s", url)
+
+    async def crawl_page(url: str, section: str, depth: int) -> None:
+        async with semaphore:
+            try:
+                async with client.get(url) as response:
+                    response.raise_for_status()
+                    html = await response.text(errors="replace")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                logger.warning("Failed to fetch %s: %s", url, str(exc) or type(exc).__name__)
+                return
+
+        document = await loop.run_in_executor(executor, parse_document, html)
+        if out is not None:
+            await loop.run_in_executor(executor, save_page, out, url, section, html, document)
+
+        for href in document.links:
+            try:
+                absolute_url = urldefrag(urljoin(url, href)).url
+            except ValueError as exc:
+                logger.warning("Skipping malformed link %r on %s: %s", href, url, exc)
+                continue
+            if link_filter is not None and not link_filter.allows(absolute_url, section, depth + 1):
+                continue
+            if absolute_url in visited:
+                continue
+            if max_links is not None and len(visited) >= max_links:
+                return
+            visited.add(absolute_url)
+            schedule(absolute_url, section, depth + 1)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    jar = copy_cookies(session.cookies if session is not None else requests.cookies.RequestsCookieJar(), base_url)
+    client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+    async with aiohttp.ClientSession(cookie_jar=jar, connector=connector, timeout=client_timeout) as client:
+        for section in load_sections(sections_file):
+            url = urljoin(base_url, section)
+            visited.add(url)
+            schedule(url, section, 0)
+        try:
+            while tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            # Only reached with tasks left when the loop itself failed or
+            # was cancelled; do not leave them running against a closed client.
+            pending = list(tasks)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    return visited
+
+
+def run(
+    base_url: str,
+    sections_file: str,
+    max_links: int | None = None,
+    session: requests.Session | None = None,
+    concurrency: int = 50,
+    output_dir: str | Path | None = None,
+    link_filter: LinkFilter | None = None,
+    timeout: float | Tuple[float, float] = DEFAULT_TIMEOUT,
+) -> Set[str]:
+    """Synchronous wrapper around :func:`run_async`."""
+
+    return asyncio.run(
+        run_async(
+            base_url,
+            sections_file,
+            max_links=max_links,
+            session=session,
+            concurrency=concurrency,
+            output_dir=output_dir,
+            link_filter=link_filter,
+            timeout=timeout,
+        )
+    )
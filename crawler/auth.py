@@ -1,11 +1,25 @@
 import json
+import logging
+import os
+import tempfile
+import threading
 import time
-from typing import Optional
+from pathlib import Path
+from typing import Any, Callable, Optional, Set, Union
+from urllib.parse import urlsplit
 
-import requests
 from requests import Session
+from requests.cookies import create_cookie
 from requests.exceptions import RequestException
 
+from .session import make_session
+
+logger = logging.getLogger(__name__)
+
+LOGIN_URL = "https://simplesolutions.com.ar/elcanton/"
+# The site sends logged-out visitors here; the form itself posts to LOGIN_URL.
+LOGIN_PAGE_URL = "https://simplesolutions.com.ar/elcanton/login"
+
 
 class LoginError(Exception):
     """Raised when authentication fails due to network or credential issues."""
@@ -17,7 +31,8 @@ def login(session: Optional[Session], creds_path: str) -> Session:
     Parameters
     ----------
     session:
-        Existing session instance. If ``None`` a new session is created.
+        Existing session instance. If ``None`` a new session is created with
+        :func:`crawler.session.make_session`.
     creds_path:
         Path to a JSON file containing ``{"user": ..., "password": ...}``.
 
@@ -33,7 +48,7 @@ def login(session: Optional[Session], creds_path: str) -> Session:
     LoginError
         If authentication fails after retries.
     """
-    session = session or requests.Session()
+    session = session or make_session()
 
     # Load credentials
     try:
@@ -44,7 +59,16 @@ def login(session: Optional[Session], creds_path: str) -> Session:
     except (OSError, KeyError, json.JSONDecodeError) as exc:
         raise ValueError("Invalid credentials file") from exc
 
-    url = "https://simplesolutions.com.ar/elcanton/"
+    return authenticate(session, username, password)
+
+
+def authenticate(session: Session, username: str, password: str, url: str = LOGIN_URL) -> Session:
+    """Post ``username`` and ``password`` to ``url`` with *session*.
+
+    The request is attempted up to five times with exponential backoff;
+    :class:`LoginError` is raised when every attempt fails.
+    """
+
     payload = {"username": username, "password": password}
 
     max_attempts = 5
@@ -62,3 +86,148 @@ def login(session: Optional[Session], creds_path: str) -> Session:
             backoff *= 2
 
 
+class AuthSession:
+    """Session wrapper that keeps the SS Canton login alive.
+
+    Cookies are loaded from ``cookie_file`` when it exists, so a new run can
+    reuse the previous login, and saved there after every authentication;
+    cookies that have already expired are not loaded. Credentials are
+    posted to ``login_url``. A response to ``get`` or ``post`` that signals
+    an expired login -- a 401/403 status or a redirect to ``login_page`` --
+    triggers one re-authentication, after which the request is repeated
+    once.
+    Re-authentication happens under a lock: workers that hit the expiry
+    together wait for the first one to log in again and then simply retry.
+    Every other attribute is delegated to the wrapped session, like
+    :class:`crawler.httpcache.CachingSession`.
+
+    Pages the account is not allowed to see answer the same way, so such a
+    response is returned as a real denial, without logging in, when the last
+    login is less than ``relogin_interval`` seconds old, and a URL that is
+    still refused right after a new login is never retried with another.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        session: Optional[Session] = None,
+        cookie_file: Union[str, Path, None] = None,
+        login_url: str = LOGIN_URL,
+        login_page: str = LOGIN_PAGE_URL,
+        relogin_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.session = session if session is not None else make_session()
+        self.username = username
+        self.password = password
+        self.cookie_file = Path(cookie_file) if cookie_file is not None else None
+        self.login_url = login_url
+        self.login_page = login_page
+        self.relogin_interval = relogin_interval
+        self.logins = 0
+        self._clock = clock
+        self._generation = 0
+        self._last_login = float("-inf")
+        self._denied: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    def start(self) -> "AuthSession":
+        """Reuse saved cookies if there are any, otherwise log in."""
+
+        if not self.load_cookies():
+            self._login()
+        return self
+
+    def load_cookies(self) -> bool:
+        if self.cookie_file is None:
+            return False
+        try:
+            cookies = json.loads(self.cookie_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        loaded = 0
+        for data in cookies:
+            cookie = create_cookie(**data)
+            if cookie.is_expired():
+                continue
+            self.session.cookies.set_cookie(cookie)
+            loaded += 1
+        logger.info("Reusing %d saved cookies from %s", loaded, self.cookie_file)
+        return bool(loaded)
+
+    def save_cookies(self) -> None:
+        if self.cookie_file is None:
+            return
+        cookies = [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path,
+             "secure": c.secure, "expires": c.expires}
+            for c in self.session.cookies
+        ]
+        self.cookie_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cookie_file.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(cookies, fh)
+            os.replace(tmp, self.cookie_file)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def is_expired(self, response) -> bool:
+        """Return whether *response* shows that the login is no longer valid."""
+
+        if response.status_code in (401, 403):
+            return True
+        if not getattr(response, "history", None):
+            return False
+        landed, login = urlsplit(response.url), urlsplit(self.login_page)
+        return (landed.netloc, landed.path.rstrip("/")) == (login.netloc, login.path.rstrip("/"))
+
+    def _login(self) -> None:
+        authenticate(self.session, self.username, self.password, self.login_url)
+        self.logins += 1
+        self._generation += 1
+        self._last_login = self._clock()
+        self.save_cookies()
+
+    def reauthenticate(self, generation: int) -> bool:
+        """Log in again unless that already happened after *generation*.
+
+        Returns whether the request should be repeated: ``False`` when the
+        last login is too recent to have expired.
+        """
+
+        with self._lock:
+            if self._generation != generation:
+                return True
+            if self._clock() - self._last_login < self.relogin_interval:
+                return False
+            logger.info("Session expired, logging in again")
+            self._login()
+            return True
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        generation = self._generation
+        response = self.session.request(method, url, **kwargs)
+        if not self.is_expired(response) or url in self._denied:
+            return response
+        if not self.reauthenticate(generation):
+            logger.warning("Access denied to %s by a fresh login", url)
+            return response
+        response.close()
+        response = self.session.request(method, url, **kwargs)
+        if self.is_expired(response):
+            logger.warning("Access denied to %s after logging in again", url)
+            with self._lock:
+                self._denied.add(url)
+        return response
+
+    def get(self, url: str, **kwargs: Any):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, data: Any = None, **kwargs: Any):
+        return self.request("POST", url, data=data, **kwargs)
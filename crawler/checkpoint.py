@@ -0,0 +1,133 @@
+"""SQLite checkpoint of the crawl frontier and visited set."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from queue import Queue
+from typing import List, Set, Tuple
+
+_PENDING = 0
+_DONE = 1
+_FAILED = 2
+
+
+class CrawlCheckpoint:
+    """Persist every scheduled URL and whether it has been crawled.
+
+    Updates are buffered in memory and written in one transaction every
+    *flush_interval* seconds or *batch_size* updates, whichever comes first,
+    so checkpointing adds little overhead per page. After a crash, URLs
+    still marked pending (including those in flight) and those whose fetch
+    failed form the frontier to resume from, and all stored URLs form the
+    visited set.
+    """
+
+    def __init__(self, path: str | Path, flush_interval: float = 5.0, batch_size: int = 500) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            "id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL, section TEXT NOT NULL, "
+            "depth INTEGER NOT NULL DEFAULT 0, state INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._added: List[Tuple[str, str, int]] = []
+        self._states: List[Tuple[int, str]] = []
+        self._last_flush = time.monotonic()
+
+    def reset(self) -> None:
+        """Forget every stored URL, e.g. before a fresh crawl."""
+
+        with self._lock:
+            self._added.clear()
+            self._states.clear()
+            self._conn.execute("DELETE FROM urls")
+            self._conn.commit()
+
+    def load(self) -> Tuple[Set[str], List[Tuple[str, str, int]]]:
+        """Return ``(visited, frontier)`` as stored on disk.
+
+        Frontier items are ``(url, section, depth)`` tuples in the order they
+        were scheduled: pending URLs and those recorded with :meth:`failed`.
+        """
+
+        self.flush()
+        with self._lock:
+            visited = {url for (url,) in self._conn.execute("SELECT url FROM urls")}
+            frontier = list(
+                self._conn.execute("SELECT url, section, depth FROM urls WHERE state != ? ORDER BY id", (_DONE,))
+            )
+        return visited, frontier
+
+    def add(self, url: str, section: str, depth: int = 0) -> None:
+        """Record that *url* has been scheduled."""
+
+        with self._lock:
+            self._added.append((url, section, depth))
+            self._maybe_flush()
+
+    def done(self, url: str) -> None:
+        """Record that *url* has been crawled."""
+
+        self._set_state(url, _DONE)
+
+    def failed(self, url: str) -> None:
+        """Record that fetching *url* failed, so a resumed crawl retries it."""
+
+        self._set_state(url, _FAILED)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+    def _set_state(self, url: str, state: int) -> None:
+        with self._lock:
+            self._states.append((state, url))
+            self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        pending = len(self._added) + len(self._states)
+        if pending >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._added or self._states:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO urls (url, section, depth, state) VALUES (?, ?, ?, ?)",
+                    [(url, section, depth, _PENDING) for url, section, depth in self._added],
+                )
+                self._conn.executemany("UPDATE urls SET state = ? WHERE url = ?", self._states)
+            self._added.clear()
+            self._states.clear()
+        self._last_flush = time.monotonic()
+
+
+class CheckpointQueue(Queue):
+    """Queue recording every ``(url, section, depth)`` put into it in a checkpoint.
+
+    Items are recorded before they are queued and outside the queue's
+    mutex, so a checkpoint flush never blocks the other workers' ``get``
+    and ``put`` calls.
+    """
+
+    def __init__(self, checkpoint: CrawlCheckpoint) -> None:
+        super().__init__()
+        self.checkpoint = checkpoint
+
+    def put(self, item, block: bool = True, timeout: float | None = None) -> None:
+        if item is not None:
+            self.checkpoint.add(*item)
+        super().put(item, block, timeout)
@@ -1,10 +1,27 @@
 from __future__ import annotations
 
 import hashlib
+import json
+import logging
 import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
 from pathlib import Path
 from urllib.parse import urlparse
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024
+# Link targets treated as documents to download rather than pages to crawl.
+DOCUMENT_EXTENSIONS = frozenset({
+    "pdf", "doc", "docx", "xls", "xlsx", "ppt", "pptx", "odt", "ods", "rtf",
+    "zip", "rar", "7z",
+})
+TEMP_PREFIX = ".download-"
+INDEX_NAME = ".hash-index.jsonl"
+
+logger = logging.getLogger(__name__)
 
 
 def _sha256sum(path: Path) -> str:
@@ -16,11 +33,155 @@ def _sha256sum(path: Path) -> str:
     return h.hexdigest()
 
 
+def stream_to_temp(response, directory: Path, chunk_size: int = CHUNK_SIZE) -> Tuple[Path, str]:
+    """Write the streamed body of *response* to a temporary file.
+
+    The file is created in *directory* so it can later be renamed into place
+    atomically, and the SHA256 checksum is updated chunk by chunk, keeping
+    memory use constant regardless of the file size. Returns the temporary
+    path and the hex digest; the file is removed if the transfer fails.
+    """
+    h = hashlib.sha256()
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=TEMP_PREFIX, suffix=".part")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    h.update(chunk)
+                    f.write(chunk)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return Path(tmp), h.hexdigest()
+
+
+class HashIndex:
+    """Content-hash index of the files stored in a download directory.
+
+    Each entry maps a file name to its ``sha256``, ``size`` and ``mtime_ns``
+    and is kept in a JSON-lines sidecar inside the directory.  On
+    :meth:`load` the sidecar is reconciled with the directory, hashing only
+    files whose stat no longer matches, and rewritten atomically if anything
+    changed.  Afterwards every new file is appended as one line, so checking
+    a download for duplicates is a dictionary lookup.
+
+    ``store_lock`` serialises the stores into the directory (see
+    :func:`_store`).  :func:`hash_index` hands out one index per directory,
+    so every :func:`download_file` call and :class:`DownloadManager` writing
+    there shares the same lock.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.path = directory / INDEX_NAME
+        self.store_lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._by_hash: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, directory: Path) -> "HashIndex":
+        index = cls(directory)
+        previous: Dict[str, dict] = {}
+        if index.path.exists():
+            with index.path.open('r', encoding='utf-8') as handle:
+                for line in handle:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning("Skipping corrupt hash index line in %s", index.path)
+                        continue
+                    previous[entry["file"]] = entry
+
+        changed = False
+        # Sections such as ``elcanton/novedades`` store their files in
+        # subdirectories, so entries are keyed by their relative path.
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for file_name in files:
+                if file_name.startswith('.'):
+                    continue
+                file_path = Path(root, file_name)
+                name = file_path.relative_to(directory).as_posix()
+                stat = file_path.stat()
+                entry = previous.pop(name, None)
+                if entry is None or (entry["mtime_ns"], entry["size"]) != (stat.st_mtime_ns, stat.st_size):
+                    entry = {
+                        "file": name,
+                        "sha256": _sha256sum(file_path),
+                        "size": stat.st_size,
+                        "mtime_ns": stat.st_mtime_ns,
+                    }
+                    changed = True
+                index._insert(entry)
+        if changed or previous:
+            index.save()
+        return index
+
+    def _insert(self, entry: dict) -> None:
+        self._entries[entry["file"]] = entry
+        self._by_hash.setdefault(entry["sha256"], entry["file"])
+
+    def find(self, digest: str) -> Optional[Path]:
+        """Return the stored file whose content hashes to *digest*, if any."""
+        with self._lock:
+            name = self._by_hash.get(digest)
+            if name is None:
+                return None
+            path = self.directory / name
+            entry = self._entries[name]
+            try:
+                stat = path.stat()
+            except OSError:
+                stat = None
+            # Same check as load: a rewrite of the same length still moves mtime.
+            if stat is not None and (stat.st_size, stat.st_mtime_ns) == (entry["size"], entry["mtime_ns"]):
+                return path
+            # The file was removed or rewritten behind our back.
+            del self._by_hash[digest]
+            del self._entries[name]
+            return None
+
+    def add(self, path: Path, digest: str) -> None:
+        """Record *path* with content hash *digest* and append it to the sidecar."""
+        stat = path.stat()
+        name = path.resolve().relative_to(self.directory.resolve()).as_posix()
+        entry = {"file": name, "sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._insert(entry)
+            with self.path.open('a', encoding='utf-8') as handle:
+                handle.write(line)
+
+    def save(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with self._lock:
+            with tmp.open('w', encoding='utf-8') as handle:
+                for entry in self._entries.values():
+                    handle.write(json.dumps(entry) + "\n")
+            os.replace(tmp, self.path)
+
+
+_INDEXES: Dict[Path, HashIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def hash_index(directory: Path) -> HashIndex:
+    """Return the :class:`HashIndex` for *directory*, loading it only once per process."""
+    key = directory.resolve()
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is None:
+            index = _INDEXES[key] = HashIndex.load(key)
+        return index
+
+
 def download_file(session,
                   url: str,
                   section: str,
                   dest_dir: Optional[str],
-                  counter: Dict[str, int]) -> Optional[Path]:
+                  counter: Dict[str, int],
+                  index: Optional[HashIndex] = None) -> Optional[Path]:
     """Download ``url`` using ``session`` into ``dest_dir``.
 
     Parameters
@@ -34,45 +195,196 @@ def download_file(session,
         environment variable.
     counter: Shared dictionary keeping track of the number of files per
         section.
+    index: Content-hash index used to detect duplicates. Defaults to the
+        shared index of the destination directory (see :func:`hash_index`).
 
     Returns
     -------
     Path to the downloaded file or ``None`` if the file already exists.
     """
+    dest_path = _destination(dest_dir)
+    ext = _extension(url)
+
+    next_index = counter.get(section, 0) + 1
+    file_path = dest_path / _file_name(section, next_index, ext)
+
+    if file_path.exists():
+        return file_path
+
+    # Stream the content to a temporary file while hashing it
+    with closing(session.get(url, stream=True)) as response:
+        response.raise_for_status()
+        tmp_path, file_hash = stream_to_temp(response, dest_path)
+
+    if index is None:
+        index = hash_index(dest_path)
+    with index.store_lock:
+        return _store(tmp_path, file_hash, dest_path, section, ext, counter, index)
+
+
+def _destination(dest_dir: Optional[str]) -> Path:
     if dest_dir is None:
         base = 'test_results/documentos' if os.getenv('TEST_MODE') else 'documentos'
     else:
         base = dest_dir
-
     dest_path = Path(base)
     dest_path.mkdir(parents=True, exist_ok=True)
+    return dest_path
 
-    # Determine extension from URL
-    parsed = urlparse(url)
-    ext = Path(parsed.path).suffix.lstrip('.')
 
-    next_index = counter.get(section, 0) + 1
-    filename = f"{section}-{next_index}.{ext}" if ext else f"{section}-{next_index}"
-    file_path = dest_path / filename
+def _extension(url: str) -> str:
+    return Path(urlparse(url).path).suffix.lstrip('.')
 
-    if file_path.exists():
-        return file_path
 
-    # Download the content
-    response = session.get(url)
-    response.raise_for_status()
-    content = response.content
-    file_hash = hashlib.sha256(content).hexdigest()
+def _file_name(section: str, number: int, ext: str) -> str:
+    return f"{section}-{number}.{ext}" if ext else f"{section}-{number}"
 
-    # Compare with existing files using hash
-    for existing in dest_path.glob('*'):
-        try:
-            if _sha256sum(existing) == file_hash:
-                return existing
-        except OSError:
-            continue
-
-    # Save file and update counter
-    file_path.write_bytes(content)
-    counter[section] = next_index
+
+def _store(tmp_path: Path,
+           file_hash: str,
+           dest_path: Path,
+           section: str,
+           ext: str,
+           counter: Dict[str, int],
+           index: HashIndex) -> Path:
+    """Move a finished download into place, or drop it if it is a duplicate.
+
+    Must be called with ``index.store_lock`` held so that the duplicate
+    check, the name allocation and the rename happen atomically for
+    everything writing to *dest_path*.  The temporary file is removed if
+    storing it fails.
+    """
+    try:
+        existing = index.find(file_hash)
+        if existing is not None:
+            tmp_path.unlink(missing_ok=True)
+            return existing
+
+        number = counter.get(section, 0) + 1
+        file_path = dest_path / _file_name(section, number, ext)
+        while file_path.exists():
+            number += 1
+            file_path = dest_path / _file_name(section, number, ext)
+        # A section like ``elcanton/novedades`` stores into a subdirectory.
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    index.add(file_path, file_hash)
+    counter[section] = number
     return file_path
+
+
+class DownloadManager:
+    """Download files in parallel on a dedicated thread pool.
+
+    The pool is separate from the one crawling pages, so slow attachments do
+    not hold up the crawl.  :meth:`submit` is thread-safe: a URL that is
+    already queued or downloading returns the existing future, names of the
+    form ``{section}-{n}`` are allocated under the directory's
+    :attr:`HashIndex.store_lock` once the content is known, and content
+    already present in the directory is not stored twice.
+
+    Parameters
+    ----------
+    session: requests-like session with ``get`` method. It is shared by the
+        download threads.
+    dest_dir: Destination directory, chosen as in :func:`download_file`
+        when ``None``.
+    max_workers: Number of download threads.
+    counter: Dictionary keeping track of the number of files per section.
+        A new one is created when omitted.
+    extensions: File extensions (without dot) that :meth:`accepts` treats
+        as downloadable documents.
+    allow_hosts: Hosts :meth:`accepts` downloads from. Empty means any host.
+    limit: Maximum number of distinct URLs scheduled, or ``None``.
+
+    ``files``, ``duplicates``, ``bytes`` and ``failures`` count the outcome
+    of the downloads.
+    """
+
+    def __init__(self,
+                 session,
+                 dest_dir: Optional[str] = None,
+                 max_workers: int = 4,
+                 counter: Optional[Dict[str, int]] = None,
+                 extensions: Iterable[str] = DOCUMENT_EXTENSIONS,
+                 allow_hosts: Iterable[str] = (),
+                 limit: Optional[int] = None) -> None:
+        self.session = session
+        self.dest_path = _destination(dest_dir)
+        self.counter = counter if counter is not None else {}
+        self.index = hash_index(self.dest_path)
+        self.extensions = frozenset(e.lower().lstrip('.') for e in extensions)
+        self.allow_hosts = frozenset(h.lower() for h in allow_hosts)
+        self.limit = limit
+        self.files = 0
+        self.duplicates = 0
+        self.bytes = 0
+        self.failures = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="download")
+        self._lock = threading.Lock()
+        self._futures: Dict[str, "Future[Path]"] = {}
+        self._scheduled = 0
+
+    def accepts(self, url: str) -> bool:
+        """Return whether *url* points to a document this manager downloads."""
+        parts = urlparse(url)
+        if parts.scheme not in ('http', 'https'):
+            return False
+        if self.allow_hosts and (parts.hostname or '') not in self.allow_hosts:
+            return False
+        return _extension(url).lower() in self.extensions
+
+    def submit(self, url: str, section: str) -> Optional["Future[Path]"]:
+        """Schedule *url* for download and return a future for its local path.
+
+        Returns ``None`` once ``limit`` distinct URLs have been scheduled.
+        """
+        with self._lock:
+            future = self._futures.get(url)
+            if future is None:
+                if self.limit is not None and self._scheduled >= self.limit:
+                    return None
+                self._scheduled += 1
+                future = self._executor.submit(self._download, url, section)
+                self._futures[url] = future
+            return future
+
+    def _download(self, url: str, section: str) -> Path:
+        try:
+            with closing(self.session.get(url, stream=True)) as response:
+                response.raise_for_status()
+                tmp_path, file_hash = stream_to_temp(response, self.dest_path)
+            size = tmp_path.stat().st_size
+            with self.index.store_lock:
+                before = self.counter.get(section, 0)
+                path = _store(tmp_path, file_hash, self.dest_path, section, _extension(url),
+                              self.counter, self.index)
+                stored = self.counter.get(section, 0) != before
+        except BaseException as exc:
+            logger.warning("Failed to download %s: %s", url, exc)
+            # Forget failed URLs so that a later submit retries them.
+            with self._lock:
+                self._futures.pop(url, None)
+                self.failures += 1
+            raise
+        # The manager lock only guards the counters, never file I/O, so
+        # submit() calls from the crawl threads are not held up.
+        with self._lock:
+            if stored:
+                self.files += 1
+                self.bytes += size
+            else:
+                self.duplicates += 1
+        return path
+
+    def close(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "DownloadManager":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
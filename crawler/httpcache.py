@@ -0,0 +1,163 @@
+"""On-disk HTTP cache revalidated with conditional GET requests."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Response headers stored with the body and restored on a 304.
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Content-Language")
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class HttpCache:
+    """Store response bodies and their validators under *directory*.
+
+    Each URL maps to ``<sha256>.json`` (validators and a few headers) and
+    ``<sha256>.body``. Files are replaced atomically so concurrent workers
+    never observe partial entries.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def load(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the metadata stored for *url* or ``None``."""
+
+        meta_path, _ = self._paths(url)
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def body(self, url: str) -> Optional[bytes]:
+        _, body_path = self._paths(url)
+        try:
+            return body_path.read_bytes()
+        except OSError:
+            return None
+
+    def store(self, url: str, response: requests.Response) -> None:
+        """Cache *response* if it carries an ``ETag`` or ``Last-Modified``."""
+
+        if not (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+            return
+        meta = {
+            "url": url,
+            "encoding": response.encoding,
+            "headers": {k: response.headers[k] for k in _KEPT_HEADERS if k in response.headers},
+        }
+        meta_path, body_path = self._paths(url)
+        # Body first: metadata without a body is treated as a miss.
+        _atomic_write(body_path, response.content)
+        _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def conditional_headers(self, meta: Dict[str, Any]) -> Dict[str, str]:
+        headers = {}
+        if "ETag" in meta["headers"]:
+            headers["If-None-Match"] = meta["headers"]["ETag"]
+        if "Last-Modified" in meta["headers"]:
+            headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+        return headers
+
+    def record(self, hit: bool) -> None:
+        """Count a cache hit or miss."""
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+class CachingSession:
+    """Wrap a ``requests.Session`` so ``get`` revalidates against an :class:`HttpCache`.
+
+    Cached URLs are requested with ``If-None-Match``/``If-Modified-Since``.
+    A ``304 Not Modified`` answer is turned into a ``200`` response carrying
+    the cached body, so callers such as :func:`crawler.runner.crawl` and
+    :func:`crawler.network.crawl` need no changes. Streaming requests bypass
+    the cache. Every other attribute is delegated to the wrapped session.
+    """
+
+    def __init__(self, session: requests.Session, cache: HttpCache | str | Path) -> None:
+        self.session = session
+        self.cache = cache if isinstance(cache, HttpCache) else HttpCache(cache)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        if kwargs.get("stream"):
+            return self.session.get(url, **kwargs)
+
+        meta = self.cache.load(url)
+        if meta is not None:
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers.update(self.cache.conditional_headers(meta))
+            kwargs["headers"] = headers
+        response = self.session.get(url, **kwargs)
+
+        if response.status_code == 304 and meta is not None:
+            body = self.cache.body(url)
+            if body is not None:
+                self.cache.record(hit=True)
+                return self._from_cache(response, meta, body)
+            # The body vanished: fetch again without validators.
+            kwargs["headers"] = {
+                k: v for k, v in kwargs["headers"].items() if k not in ("If-None-Match", "If-Modified-Since")
+            }
+            response = self.session.get(url, **kwargs)
+
+        self.cache.record(hit=False)
+        if response.status_code == 200:
+            try:
+                self.cache.store(url, response)
+            except OSError as exc:
+                logger.warning("Could not cache %s: %s", url, exc)
+        return response
+
+    @staticmethod
+    def _from_cache(not_modified: requests.Response, meta: Dict[str, Any], body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response._content = body
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        # Validators in the 304 take precedence over the stored ones.
+        response.headers.update(
+            {k: not_modified.headers[k] for k in _KEPT_HEADERS if k in not_modified.headers}
+        )
+        response.encoding = meta.get("encoding")
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        return response
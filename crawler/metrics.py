@@ -0,0 +1,69 @@
+"""Throughput counters for the end-of-run performance report."""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+class CrawlMetrics:
+    """Thread-safe totals of pages, bytes and time spent per stage.
+
+    :func:`crawler.runner.crawl` records every fetched page with
+    :meth:`record_page`, and ``saved_pages`` lists the HTML files stored
+    during this run; whole stages such as the content extraction are timed
+    with :meth:`stage`. :meth:`report` turns the totals into rates
+    over the wall-clock time since the object was created.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.started = clock()
+        self.pages = 0
+        self.bytes = 0
+        self.fetch_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.stages: Dict[str, float] = {}
+        self.saved_pages: List[Path] = []
+
+    def record_page(
+        self, nbytes: int, fetch_seconds: float, parse_seconds: float, path: Optional[Path] = None
+    ) -> None:
+        with self._lock:
+            if path is not None:
+                self.saved_pages.append(path)
+            self.pages += 1
+            self.bytes += nbytes
+            self.fetch_seconds += fetch_seconds
+            self.parse_seconds += parse_seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Add the wall-clock time of the ``with`` block to stage *name*."""
+
+        start = self._clock()
+        try:
+            yield
+        finally:
+            elapsed = self._clock() - start
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def report(self) -> Dict[str, object]:
+        with self._lock:
+            elapsed = self._clock() - self.started
+            pages = self.pages
+            return {
+                "elapsed_seconds": round(elapsed, 3),
+                "pages": pages,
+                "pages_per_second": round(pages / elapsed, 2) if elapsed > 0 else 0.0,
+                "bytes": self.bytes,
+                "megabytes_per_second": round(self.bytes / elapsed / 1e6, 3) if elapsed > 0 else 0.0,
+                "fetch_seconds": round(self.fetch_seconds, 3),
+                "parse_seconds": round(self.parse_seconds, 3),
+                "parse_ms_per_page": round(1000 * self.parse_seconds / pages, 3) if pages else 0.0,
+                "stages": {name: round(seconds, 3) for name, seconds in self.stages.items()},
+            }
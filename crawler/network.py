@@ -1,47 +1,75 @@
-"""Network-related functions for the Canton crawler."""
+"""Network-related functions for the Canton crawler.
+
+Each call is retried by :func:`crawler.utils.retry` within
+:data:`RETRY_BUDGET` seconds, and ``timeout`` defaults to
+:data:`crawler.session.DEFAULT_TIMEOUT`. That decorator is the only retry
+layer meant for these calls: pass sessions created with
+``make_session(retries=0)``. With adapter retries as well the attempts
+multiply, e.g. three tries of four adapter attempts each send twelve
+requests to a failing server.
+"""
 
 import logging
+import os
+from contextlib import closing
 from pathlib import Path
 from typing import Optional
 
 import requests
 
+from .downloads import stream_to_temp
 from .logging_config import configure_logging
+from .session import DEFAULT_TIMEOUT
 from .utils import retry
 
 configure_logging()
 
 logger = logging.getLogger(__name__)
 
+RETRY_BUDGET = 120.0
+"""Seconds a call below may spend including retries."""
+
+TRIES = 3
+"""Attempts made by each call below."""
+
 
-@retry((requests.RequestException,))
-def login(session: requests.Session, url: str, payload: dict) -> requests.Response:
+@retry((requests.RequestException,), tries=TRIES, timeout=DEFAULT_TIMEOUT, budget=RETRY_BUDGET)
+def login(
+    session: requests.Session, url: str, payload: dict, timeout=None
+) -> requests.Response:
     """Perform login to the given URL with provided payload."""
     logger.info("Starting login to %s", url)
-    response = session.post(url, data=payload)
+    response = session.post(url, data=payload, timeout=timeout)
     response.raise_for_status()
     logger.info("Login successful to %s", url)
     return response
 
 
-@retry((requests.RequestException,))
-def crawl(session: requests.Session, url: str) -> str:
+@retry((requests.RequestException,), tries=TRIES, timeout=DEFAULT_TIMEOUT, budget=RETRY_BUDGET)
+def crawl(session: requests.Session, url: str, timeout=None) -> str:
     """Crawl the given URL and return its text content."""
     logger.info("Starting crawl of %s", url)
-    response = session.get(url)
+    response = session.get(url, timeout=timeout)
     response.raise_for_status()
     logger.info("Finished crawl of %s", url)
     return response.text
 
 
-@retry((requests.RequestException,))
+@retry((requests.RequestException,), tries=TRIES, timeout=DEFAULT_TIMEOUT, budget=RETRY_BUDGET)
 def download_file(
-    session: requests.Session, url: str, dest: Path
+    session: requests.Session, url: str, dest: Path, timeout=None
 ) -> Optional[Path]:
-    """Download file from URL and save to destination path."""
+    """Download file from URL and save to destination path.
+
+    The body is streamed to a temporary file next to ``dest`` and renamed
+    into place once complete, so memory use does not depend on the file
+    size and ``dest`` never holds a partial download. ``timeout`` bounds
+    the connection and each read, not the whole transfer.
+    """
     logger.info("Downloading file from %s", url)
-    response = session.get(url)
-    response.raise_for_status()
-    dest.write_bytes(response.content)
+    with closing(session.get(url, stream=True, timeout=timeout)) as response:
+        response.raise_for_status()
+        tmp_path, _ = stream_to_temp(response, dest.parent)
+    os.replace(tmp_path, dest)
     logger.info("File downloaded to %s", dest)
     return dest
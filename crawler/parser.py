@@ -1,9 +1,18 @@
+import logging
 import re
 from html import unescape
 import unicodedata
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is optional
+    etree = None
+
+LOGGER = logging.getLogger(__name__)
 
 MENU_CLASSES = {
     "nav",
@@ -15,33 +24,191 @@ MENU_CLASSES = {
     "footer",
 }
 
-def extract_text(html: str) -> str:
-    """Return clean text extracted from ``html``.
+# Tags removed together with their contents.
+DROP_TAGS = {"script", "style", "img"}
 
-    The function removes script, style, anchor and image tags. It also drops
-    elements that look like navigation menus based on common CSS classes.
-    Remaining text is normalised by decoding HTML entities, standardising
-    unicode representation and collapsing consecutive whitespace.
+# Tags whose strings BeautifulSoup stores in special containers that
+# ``get_text`` ignores; their contents are dropped as well.
+HIDDEN_TEXT_TAGS = {"template", "rt", "rp"}
+
+BACKENDS = ("lxml", "html.parser")
+# lxml repairs misnested or unclosed markup into a different tree than
+# html.parser does, so it stays opt-in to keep the output of existing
+# callers unchanged.
+DEFAULT_BACKEND = "html.parser"
+
+
+def _is_menu(classes: Optional[str]) -> bool:
+    return bool(classes) and any(cls in MENU_CLASSES for cls in classes.split())
+
+
+@dataclass
+class ParsedDocument:
+    """Fields extracted from a single parse of an HTML page."""
+
+    title: Optional[str]
+    text: str
+    links: List[str] = field(default_factory=list)
+
+
+def _soup_walk(soup: BeautifulSoup, links: List[str]) -> Iterator[str]:
+    """Yield the strings kept by :func:`extract_text` in one pass over *soup*.
+
+    The ``href`` of every anchor, including those inside dropped subtrees, is
+    appended to *links* in document order.
     """
-    soup = BeautifulSoup(html, "html.parser")
 
-    # Remove script and style elements entirely
-    for tag in soup(["script", "style"]):
-        tag.decompose()
+    types = Tag.MAIN_CONTENT_STRING_TYPES
+    # Frames are (children iterator, whether the subtree is dropped).
+    stack: List[Tuple[Iterator, bool]] = [(iter(soup.contents), False)]
+    while stack:
+        children, dropped = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            continue
+        if isinstance(child, NavigableString):
+            if not dropped and type(child) in types:
+                yield child
+            continue
+        if not isinstance(child, Tag):
+            continue
+        if child.name == "a":
+            href = child.get("href")
+            if href is not None:
+                links.append(href)
+        # Anchors are unwrapped, so a menu class on a link keeps its text.
+        child_dropped = dropped or child.name in DROP_TAGS or (
+            child.name != "a" and _is_menu(" ".join(child.get_attribute_list("class", [])))
+        )
+        stack.append((iter(child.contents), child_dropped))
+
+
+class _LxmlDocumentTarget:
+    """lxml parser target collecting the fields of a :class:`ParsedDocument`.
+
+    The document is never materialised as a tree: dropped subtrees are
+    tracked with a depth counter while parser events stream in.  Adjacent
+    ``data`` events are merged into one string, as BeautifulSoup does, so
+    entity boundaries do not introduce separators.
+    """
+
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self.links: List[str] = []
+        self.title: Optional[str] = None
+        self._pending: List[str] = []
+        self._skip_depth = 0
+        self._title_seen = False
+        self._in_title = False
+        self._title_parts: List[str] = []
+        # Mixed content makes BeautifulSoup's ``title.string`` ``None``.
+        self._title_simple = True
+
+    def _flush(self) -> None:
+        if self._pending:
+            self.strings.append("".join(self._pending))
+            self._pending.clear()
 
-    # Replace links with their contained text and drop images
-    for tag in soup.find_all("a"):
-        tag.unwrap()
-    for tag in soup.find_all("img"):
-        tag.decompose()
+    def start(self, tag: str, attrib) -> None:
+        self._flush()
+        if self._in_title:
+            self._title_simple = False
+        if tag == "title" and not self._title_seen:
+            self._title_seen = self._in_title = True
+        elif tag == "a":
+            href = attrib.get("href")
+            if href is not None:
+                self.links.append(href)
+        if self._skip_depth:
+            self._skip_depth += 1
+        elif tag in DROP_TAGS or tag in HIDDEN_TEXT_TAGS:
+            self._skip_depth = 1
+        elif tag != "a" and _is_menu(attrib.get("class")):
+            # Anchors are unwrapped, so a menu class on a link keeps its text.
+            self._skip_depth = 1
 
-    # Remove common navigation/menu containers
-    for tag in soup.find_all(class_=lambda c: c and any(cls in MENU_CLASSES for cls in c.split())):
-        tag.decompose()
+    def end(self, tag: str) -> None:
+        self._flush()
+        if tag == "title" and self._in_title:
+            self._in_title = False
+            if self._title_parts and self._title_simple:
+                self.title = "".join(self._title_parts)
+        if self._skip_depth:
+            self._skip_depth -= 1
 
-    # Get text and normalise encoding and whitespace
-    text = soup.get_text(separator=" ")
+    def data(self, data: str) -> None:
+        if self._in_title:
+            self._title_parts.append(data)
+        if not self._skip_depth:
+            self._pending.append(data)
+
+    def comment(self, text: str) -> None:
+        self._flush()
+        if self._in_title:
+            self._title_simple = False
+
+    def pi(self, target: str, data: Optional[str] = None) -> None:
+        self._flush()
+
+    def close(self) -> "_LxmlDocumentTarget":
+        self._flush()
+        return self
+
+
+def _clean(strings: Iterable[str]) -> str:
+    """Join *strings* and normalise entities, unicode and whitespace."""
+
+    text = " ".join(strings)
     text = unescape(text)
     text = unicodedata.normalize("NFKC", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def parse_document(html: str, backend: Optional[str] = None) -> ParsedDocument:
+    """Parse ``html`` once and return its title, cleaned text and links.
+
+    ``text`` is the same string returned by :func:`extract_text`. ``title`` is
+    the string of the first ``<title>`` element (``None`` when missing or
+    empty) and ``links`` holds the ``href`` of every anchor in document
+    order. ``backend`` selects the parser: the pure-Python ``"html.parser"``
+    (the default) or the faster ``"lxml"``, which requires lxml. Both give
+    the same result for well-formed pages, but on broken markup such as a
+    ``<div>`` inside a ``<p>`` lxml closes elements at other points, so
+    text dropped with a menu by html.parser may be kept, and vice versa.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == "lxml":
+        if etree is None:
+            raise ValueError("The lxml backend requires the lxml package")
+        target = _LxmlDocumentTarget()
+        parser = etree.HTMLParser(target=target)
+        try:
+            parser.feed(html)
+            parser.close()
+        except (ValueError, etree.LxmlError):
+            LOGGER.debug("lxml could not parse document, using html.parser")
+        else:
+            return ParsedDocument(title=target.title, text=_clean(target.strings), links=target.links)
+    elif backend != "html.parser":
+        raise ValueError(f"Unknown parser backend: {backend}")
+
+    soup = BeautifulSoup(html, "html.parser")
+    links: List[str] = []
+    text = _clean(_soup_walk(soup, links))
+    title = soup.title.string if soup.title else None
+    return ParsedDocument(title=str(title) if title is not None else None, text=text, links=links)
+
+
+def extract_text(html: str, backend: Optional[str] = None) -> str:
+    """Return clean text extracted from ``html``.
+
+    The function removes script, style, anchor and image tags. It also drops
+    elements that look like navigation menus based on common CSS classes.
+    Remaining text is normalised by decoding HTML entities, standardising
+    unicode representation and collapsing consecutive whitespace.
+
+    All of this happens in a single traversal of the parsed document; see
+    :func:`parse_document` for the available backends.
+    """
+    return parse_document(html, backend).text
@@ -0,0 +1,166 @@
+"""Per-host politeness and adaptive concurrency for the crawl frontier."""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second.
+
+    :meth:`reserve` always takes a token and returns how long the caller has
+    to wait before using it, letting the balance go negative so concurrent
+    callers are spaced out instead of racing for the next refill.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be 1 or greater")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return the seconds to wait before using it."""
+
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+
+@dataclass
+class _HostState:
+    bucket: TokenBucket
+    limit: float
+    in_flight: int = 0
+    last_decrease: float = float("-inf")
+
+
+class RateController:
+    """Limit request rate and concurrency per host using AIMD.
+
+    Every host gets a :class:`TokenBucket` capping its request rate and a
+    concurrency limit that grows additively (``increase / limit`` per fast
+    success, roughly ``increase`` per round of requests) and is multiplied by
+    ``decrease`` on errors or responses slower than ``slow_threshold``
+    seconds. Decreases are applied at most once per ``slow_threshold`` so a
+    burst of failures from one overloaded round only cuts the limit once.
+
+    Parameters
+    ----------
+    rate:
+        Maximum requests per second per host.
+    burst:
+        Bucket capacity, i.e. requests allowed back to back after idling.
+    max_concurrency:
+        Upper bound of simultaneous requests per host.
+    initial_concurrency:
+        Starting limit; defaults to ``max_concurrency``.
+    min_concurrency:
+        Lower bound the limit never drops below.
+    slow_threshold:
+        Latency in seconds above which a response counts as a slowdown.
+    increase, decrease:
+        Additive increase and multiplicative decrease factors.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: float = 10.0,
+        max_concurrency: int = 16,
+        initial_concurrency: Optional[int] = None,
+        min_concurrency: int = 1,
+        slow_threshold: float = 2.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError("expected 1 <= min_concurrency <= max_concurrency")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.initial_concurrency = initial_concurrency or max_concurrency
+        self.slow_threshold = slow_threshold
+        self.increase = increase
+        self.decrease = decrease
+        self._clock = clock
+        self._sleep = sleep
+        self._hosts: Dict[str, _HostState] = {}
+        self._cond = threading.Condition()
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            limit = min(max(self.initial_concurrency, self.min_concurrency), self.max_concurrency)
+            state = _HostState(TokenBucket(self.rate, self.burst, self._clock), float(limit))
+            self._hosts[host] = state
+        return state
+
+    def limit(self, url: str) -> int:
+        """Return the current concurrency limit for the host of *url*."""
+
+        with self._cond:
+            return int(self._state(urlsplit(url).netloc).limit)
+
+    def acquire(self, url: str) -> float:
+        """Block until a request to *url* may start; return its start time."""
+
+        host = urlsplit(url).netloc
+        with self._cond:
+            state = self._state(host)
+            while state.in_flight >= int(state.limit):
+                self._cond.wait()
+            state.in_flight += 1
+        delay = state.bucket.reserve()
+        if delay:
+            self._sleep(delay)
+        return self._clock()
+
+    def release(self, url: str, started: float, ok: bool) -> None:
+        """Record the outcome of a request started with :meth:`acquire`."""
+
+        now = self._clock()
+        with self._cond:
+            state = self._state(urlsplit(url).netloc)
+            state.in_flight -= 1
+            if ok and now - started <= self.slow_threshold:
+                state.limit = min(self.max_concurrency, state.limit + self.increase / state.limit)
+            elif now - state.last_decrease >= self.slow_threshold:
+                state.limit = max(self.min_concurrency, state.limit * self.decrease)
+                state.last_decrease = now
+            self._cond.notify_all()
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """Return whether *exc* signals that the server is struggling.
+
+    Connection errors, timeouts, 5xx and 429 responses count as overload;
+    other client errors such as 404 and anything else, like a page that
+    fails to parse, do not.
+    """
+
+    if isinstance(exc, requests.HTTPError):
+        if exc.response is None:
+            return False
+        status = exc.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
@@ -2,28 +2,64 @@
 from __future__ import annotations
 
 from concurrent.futures import ThreadPoolExecutor
-from queue import Queue, Empty
-from typing import Iterable, List, Set, Tuple
-from urllib.parse import urljoin
+from pathlib import Path
+from queue import Queue
+from typing import TYPE_CHECKING, Callable, List, Set, Tuple
+from urllib.parse import urldefrag, urljoin
+import hashlib
+import logging
+import re
 import threading
+import time
 
 import requests
-from bs4 import BeautifulSoup
 
+from .checkpoint import CheckpointQueue, CrawlCheckpoint
+from .httpcache import CachingSession
+from .parser import ParsedDocument, parse_document
+from .ratelimit import RateController, is_overload_error
+from .sections import load_sections
+from .session import make_session
+from .urls import SeenSet, make_seen_set
+from .utils import RetryStats
 
-def load_sections(file_path: str) -> List[str]:
-    """Return initial section paths listed in *file_path*.
+if TYPE_CHECKING:
+    from .downloads import DownloadManager
+    from .metrics import CrawlMetrics
+    from .scope import LinkFilter
 
-    Each non-empty line in the file is considered a relative path that
-    should be crawled. Blank lines are ignored.
+logger = logging.getLogger(__name__)
+
+# Queue item telling a worker thread to exit.
+_STOP = None
+
+
+def page_stem(url: str, section_name: str) -> str:
+    """Return a file name stem unique to *url* within *section_name*."""
+
+    section = re.sub(r"[^\w.-]+", "_", section_name).strip("_") or "page"
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    return f"{section}-{digest}"
+
+
+def save_page(
+    output_dir: Path, url: str, section_name: str, html: str, document: ParsedDocument
+) -> Tuple[Path, Path]:
+    """Persist the raw *html* and the cleaned text of *document*.
+
+    Files are written to ``output_dir/html/<stem>.html`` and
+    ``output_dir/textos/<stem>.txt`` where ``<stem>`` comes from
+    :func:`page_stem`. Returns both paths.
     """
-    sections: List[str] = []
-    with open(file_path, "r", encoding="utf-8") as fh:
-        for line in fh:
-            line = line.strip()
-            if line:
-                sections.append(line)
-    return sections
+
+    stem = page_stem(url, section_name)
+    html_path = output_dir / "html" / f"{stem}.html"
+    text_path = output_dir / "textos" / f"{stem}.txt"
+    html_path.parent.mkdir(parents=True, exist_ok=True)
+    text_path.parent.mkdir(parents=True, exist_ok=True)
+    html_path.write_text(html, encoding="utf-8")
+    text_path.write_text(document.text, encoding="utf-8")
+    return html_path, text_path
 
 
 def crawl(
@@ -31,12 +67,22 @@ def crawl(
     url: str,
     section_name: str,
     max_links: int | None,
-    visited: Set[str],
-    queue: "Queue[Tuple[str, str]]",
+    visited: Set[str] | SeenSet,
+    queue: "Queue[Tuple[str, str, int]]",
     lock: threading.Lock,
-) -> None:
+    *,
+    output_dir: Path | None = None,
+    rate: RateController | None = None,
+    link_filter: LinkFilter | None = None,
+    depth: int = 0,
+    stats: RetryStats | None = None,
+    metrics: CrawlMetrics | None = None,
+    downloads: DownloadManager | None = None,
+) -> bool:
     """Fetch *url* and enqueue discovered links.
 
+    The arguments after *lock* are optional features and keyword-only.
+
     Parameters
     ----------
     session:
@@ -51,33 +97,97 @@ def crawl(
         total number of visited URLs reaches this value. This is useful for
         tests.
     visited:
-        Shared set of URLs that have already been processed.
+        Shared set of URLs that have already been processed. Any object
+        supporting ``in``, ``add`` and ``len`` works, such as the
+        canonicalising sets from :mod:`crawler.urls`.
     queue:
-        Shared queue where new URLs will be pushed for further crawling.
+        Shared queue where new URLs are pushed for further crawling as
+        ``(url, section, depth)`` items.
     lock:
-        Mutex protecting access to ``visited`` and ``queue``.
+        Mutex protecting access to ``visited``.
+    output_dir:
+        When given, the page is also persisted with :func:`save_page`. The
+        same parse yields the outgoing links and the cleaned text, so no
+        second pass over the downloaded HTML is needed.
+    rate:
+        Optional :class:`~crawler.ratelimit.RateController` that paces the
+        request and adapts concurrency to the observed latency and errors.
+    link_filter:
+        Optional :class:`~crawler.scope.LinkFilter`. Links it rejects are
+        never enqueued.
+    depth:
+        Number of links between the section page and *url*.
+    stats:
+        Optional :class:`~crawler.utils.RetryStats` counting the request,
+        the retries the session's adapter made and timeouts or failures.
+    metrics:
+        Optional :class:`~crawler.metrics.CrawlMetrics` receiving the page
+        size, the time spent fetching and parsing it and the path of the
+        stored HTML.
+    downloads:
+        Optional :class:`~crawler.downloads.DownloadManager`. Links it
+        accepts (documents such as PDFs) are handed to it instead of being
+        crawled as pages.
+
+    Returns
+    -------
+    bool
+        ``True`` when the page was fetched, ``False`` when the request
+        failed and the page should be retried later.
     """
 
+    started = rate.acquire(url) if rate is not None else 0.0
+    fetch_started = time.perf_counter()
+    ok = False
+    if stats is not None:
+        stats.add("calls")
     try:
         response = session.get(url)
+        if stats is not None:
+            stats.observe_response(response)
         response.raise_for_status()
-    except Exception:
-        return
+        ok = True
+    except Exception as exc:
+        ok = not is_overload_error(exc)
+        logger.warning("Failed to fetch %s: %s", url, exc)
+        if stats is not None:
+            stats.observe_error(exc)
+            stats.add("failures")
+        return False
+    finally:
+        if rate is not None:
+            rate.release(url, started, ok)
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    links = soup.find_all("a", href=True)
+    html = response.text
+    parse_started = time.perf_counter()
+    document = parse_document(html)
+    parse_seconds = time.perf_counter() - parse_started
+    html_path = None
+    if output_dir is not None:
+        html_path, _ = save_page(output_dir, url, section_name, html, document)
+    if metrics is not None:
+        metrics.record_page(len(response.content), parse_started - fetch_started, parse_seconds, html_path)
 
-    for link in links:
-        href = link["href"]
-        absolute_url = urljoin(url, href)
+    for href in document.links:
+        # Fragments never reach the server, so ``page#a`` and ``page#b``
+        # are the same fetch.
+        absolute_url = urldefrag(urljoin(url, href)).url
+        if downloads is not None and downloads.accepts(absolute_url):
+            downloads.submit(absolute_url, section_name)
+            continue
+        if link_filter is not None and not link_filter.allows(absolute_url, section_name, depth + 1):
+            continue
 
         with lock:
             if absolute_url in visited:
                 continue
             if max_links is not None and len(visited) >= max_links:
-                return
+                return True
             visited.add(absolute_url)
-            queue.put((absolute_url, section_name))
+        # The URL is claimed in ``visited``, so it can be queued without the
+        # lock; a checkpointing queue may write to disk here.
+        queue.put((absolute_url, section_name, depth + 1))
+    return True
 
 
 def run(
@@ -86,6 +196,16 @@ def run(
     max_workers: int = 4,
     max_links: int | None = None,
     session: requests.Session | None = None,
+    output_dir: str | Path | None = None,
+    rate: RateController | None = None,
+    cache_dir: str | Path | None = None,
+    checkpoint: str | Path | None = None,
+    resume: bool = False,
+    seen: str = "fingerprint",
+    link_filter: LinkFilter | None = None,
+    stats: RetryStats | None = None,
+    metrics: CrawlMetrics | None = None,
+    downloads: DownloadManager | None = None,
 ) -> None:
     """Start the crawler.
 
@@ -102,30 +222,146 @@ def run(
         Optional limit of total links to visit, used mainly for tests.
     session:
         Optional ``requests.Session`` to use for HTTP requests. When ``None`` a
-        new session is created internally.
+        new session is created with :func:`crawler.session.make_session`,
+        whose connection pool is sized for ``max_workers``. Together with
+        ``rate`` the session should not retry in its adapter (``retries=0``),
+        so the controller sees every error response.
+    output_dir:
+        Optional directory where every fetched page is stored as HTML and
+        cleaned text (see :func:`save_page`).
+    rate:
+        Optional :class:`~crawler.ratelimit.RateController` shared by all
+        workers to enforce per-host politeness. It replaces the adapter
+        retries of a session created here: 429 and 5xx responses slow the
+        crawl down instead of being retried, and the failed pages are left
+        for ``resume``.
+    cache_dir:
+        Optional directory of an :class:`~crawler.httpcache.HttpCache`. Pages
+        are then revalidated with conditional requests and unchanged ones
+        are served from disk.
+    checkpoint:
+        Optional SQLite file where the frontier and visited URLs are saved
+        periodically (see :class:`~crawler.checkpoint.CrawlCheckpoint`).
+    resume:
+        Continue from the state stored in ``checkpoint`` instead of starting
+        over from ``sections_file``.
+    seen:
+        Kind of visited set built with :func:`crawler.urls.make_seen_set`:
+        ``"exact"``, ``"fingerprint"`` (default) or ``"bloom"``. All of
+        them compare canonicalised URLs.
+    link_filter:
+        Optional :class:`~crawler.scope.LinkFilter` applied to discovered
+        links before they enter the queue, e.g.
+        ``LinkFilter.for_site(base_url, sections_file)``.
+    stats:
+        Optional :class:`~crawler.utils.RetryStats` collecting request,
+        retry, timeout and failure counts. They are logged when the crawl
+        ends.
+    metrics:
+        Optional :class:`~crawler.metrics.CrawlMetrics` updated for every
+        fetched page.
+    downloads:
+        Optional :class:`~crawler.downloads.DownloadManager` that receives
+        the document links found while crawling (see :func:`crawl`).
     """
 
-    session = session or requests.Session()
-    visited: Set[str] = set()
+    if session is None:
+        # The rate controller is the only retry layer when it is in use.
+        session = make_session(max_workers, retries=0) if rate is not None else make_session(max_workers)
+    stats = stats if stats is not None else RetryStats()
+    if cache_dir is not None:
+        session = CachingSession(session, cache_dir)
+    out = Path(output_dir) if output_dir is not None else None
+    visited = make_seen_set(seen)
     lock = threading.Lock()
-    q: "Queue[Tuple[str, str]]" = Queue()
+    store = CrawlCheckpoint(checkpoint) if checkpoint is not None else None
+    q: "Queue[Tuple[str, str, int] | None]" = CheckpointQueue(store) if store is not None else Queue()
+
+    frontier: List[Tuple[str, str, int]] = []
+    if store is not None and resume:
+        stored, frontier = store.load()
+        visited.update(stored)
+    elif store is not None:
+        store.reset()
+    if not visited:
+        # Seed the queue with initial sections.
+        for section in load_sections(sections_file):
+            url = urljoin(base_url, section)
+            if url not in visited:
+                visited.add(url)
+                frontier.append((url, section, 0))
+    for item in frontier:
+        q.put(item)
+
+    def handle(current_url: str, section: str, depth: int) -> None:
+        ok = crawl(
+            session,
+            current_url,
+            section,
+            max_links,
+            visited,
+            q,
+            lock,
+            output_dir=out,
+            rate=rate,
+            link_filter=link_filter,
+            depth=depth,
+            stats=stats,
+            metrics=metrics,
+            downloads=downloads,
+        )
+        if store is not None:
+            if ok:
+                store.done(current_url)
+            else:
+                store.failed(current_url)
+
+    try:
+        run_workers(q, handle, max_workers)
+    finally:
+        if store is not None:
+            store.close()
+        logger.info("Requests: %s", stats)
+
+
+def run_workers(
+    q: "Queue[Tuple | None]",
+    handle: Callable[..., None],
+    max_workers: int,
+) -> None:
+    """Process *q* with *max_workers* threads until all work is done.
+
+    Every queue item is passed to *handle* as positional arguments.
+
+    ``Queue.unfinished_tasks`` counts both queued items and items that a
+    worker is still processing, so :meth:`Queue.join` only returns once the
+    frontier is empty *and* nothing is outstanding that could add more work.
+    Workers block on the queue until then and are stopped with one sentinel
+    each, keeping every thread busy for the whole crawl.
+    """
 
-    # Seed the queue with initial sections.
-    for section in load_sections(sections_file):
-        url = urljoin(base_url, section)
-        visited.add(url)
-        q.put((url, section))
+    stop = threading.Event()
 
     def worker() -> None:
         while True:
+            item = q.get()
             try:
-                current_url, section = q.get(timeout=0.1)
-            except Empty:
-                return
-            crawl(session, current_url, section, max_links, visited, q, lock)
-            q.task_done()
+                if item is _STOP:
+                    return
+                if not stop.is_set():
+                    handle(*item)
+            except Exception:
+                logger.exception("Unhandled error while crawling %s", item[0])
+            finally:
+                q.task_done()
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         for _ in range(max_workers):
             executor.submit(worker)
-        q.join()
+        try:
+            q.join()
+        finally:
+            # On interruption remaining items are drained without work.
+            stop.set()
+            for _ in range(max_workers):
+                q.put(_STOP)
@@ -0,0 +1,123 @@
+"""Scope rules deciding which discovered links enter the crawl frontier."""
+from __future__ import annotations
+
+import posixpath
+import re
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .sections import load_section_depths
+
+# Binary assets are handled by the download stage, not the page crawler.
+DEFAULT_DENY_EXTENSIONS = frozenset({
+    "pdf", "doc", "docx", "xls", "xlsx", "ppt", "pptx", "odt", "ods", "rtf",
+    "zip", "rar", "7z", "gz", "tar",
+    "jpg", "jpeg", "png", "gif", "bmp", "svg", "webp", "ico", "tif", "tiff",
+    "mp3", "mp4", "avi", "mov", "wmv", "wav", "ogg", "webm",
+    "css", "js", "woff", "woff2", "ttf", "eot",
+})
+
+# Links that would end the authenticated session: the keyword must be a
+# whole path segment (optionally with an extension) or a query value.
+DEFAULT_DENY_PATTERNS = (
+    r"(?:^|[/?&=])(?:logout|log-out|logoff|signout|sign-out|salir|cerrar[-_]?sesion)(?:\.\w+)?(?:$|[/?&])",
+)
+
+
+class LinkFilter:
+    """Precompiled allow/deny rules applied to every discovered link.
+
+    All rules are compiled once: hosts and extensions become frozensets,
+    path prefixes a tuple for a single ``str.startswith`` call and regular
+    expressions one alternation each, so :meth:`allows` stays cheap per
+    link. Rules are checked from cheapest to most expensive.
+
+    Parameters
+    ----------
+    allow_hosts:
+        Hosts that may be crawled. Empty means any host.
+    allow_prefixes, deny_prefixes:
+        Path prefixes that a URL must (or must not) start with.
+    allow_patterns, deny_patterns:
+        Regular expressions searched, case-insensitively, in the path and
+        query of the URL.
+    deny_extensions:
+        File extensions (without dot) that are never crawled.
+    schemes:
+        Accepted URL schemes; ``mailto:``, ``javascript:`` and similar links
+        are dropped.
+    max_depth:
+        Maximum number of links followed from a section page, or ``None``.
+    section_depths:
+        Per-section overrides of ``max_depth``.
+    """
+
+    def __init__(
+        self,
+        allow_hosts: Iterable[str] = (),
+        allow_prefixes: Iterable[str] = (),
+        deny_prefixes: Iterable[str] = (),
+        allow_patterns: Iterable[str] = (),
+        deny_patterns: Iterable[str] = DEFAULT_DENY_PATTERNS,
+        deny_extensions: Iterable[str] = DEFAULT_DENY_EXTENSIONS,
+        schemes: Iterable[str] = ("http", "https"),
+        max_depth: Optional[int] = None,
+        section_depths: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.allow_hosts = frozenset(h.lower() for h in allow_hosts)
+        self.allow_prefixes: Tuple[str, ...] = tuple(allow_prefixes)
+        self.deny_prefixes: Tuple[str, ...] = tuple(deny_prefixes)
+        self.allow_re = _compile(allow_patterns)
+        self.deny_re = _compile(deny_patterns)
+        self.deny_extensions = frozenset(e.lower().lstrip(".") for e in deny_extensions)
+        self.schemes = frozenset(s.lower() for s in schemes)
+        self.max_depth = max_depth
+        self.section_depths = dict(section_depths or {})
+
+    @classmethod
+    def for_site(cls, base_url: str, sections_file: Optional[str] = None, **kwargs) -> "LinkFilter":
+        """Return a filter restricted to the host of *base_url*.
+
+        Depth limits given in *sections_file* (see
+        :func:`crawler.sections.load_section_depths`) become
+        ``section_depths``. Other keyword arguments are passed through.
+        """
+
+        host = urlsplit(base_url).hostname or ""
+        kwargs.setdefault("allow_hosts", [host] if host else [])
+        if sections_file is not None:
+            kwargs.setdefault("section_depths", load_section_depths(sections_file))
+        return cls(**kwargs)
+
+    def allows(self, url: str, section: str = "", depth: int = 0) -> bool:
+        """Return whether *url*, found *depth* links away from *section*, is in scope."""
+
+        limit = self.section_depths.get(section, self.max_depth)
+        if limit is not None and depth > limit:
+            return False
+        parts = urlsplit(url)
+        if parts.scheme.lower() not in self.schemes:
+            return False
+        if self.allow_hosts and (parts.hostname or "") not in self.allow_hosts:
+            return False
+        path = parts.path
+        ext = posixpath.splitext(path)[1]
+        if ext and ext[1:].lower() in self.deny_extensions:
+            return False
+        if self.allow_prefixes and not path.startswith(self.allow_prefixes):
+            return False
+        if self.deny_prefixes and path.startswith(self.deny_prefixes):
+            return False
+        target = f"{path}?{parts.query}" if parts.query else path
+        if self.deny_re is not None and self.deny_re.search(target):
+            return False
+        if self.allow_re is not None and not self.allow_re.search(target):
+            return False
+        return True
+
+
+def _compile(patterns: Iterable[str]) -> Optional["re.Pattern[str]"]:
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
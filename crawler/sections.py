@@ -0,0 +1,45 @@
+"""Parsing of the sections file that seeds a crawl.
+
+Each non-empty line names a section path relative to the site's base URL,
+optionally followed by the maximum link depth for that section::
+
+    novedades 2
+    galeria
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _section_lines(file_path: str) -> Iterable[Tuple[str, Optional[int]]]:
+    with open(file_path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            # Paths may contain spaces, so only a trailing integer is a depth.
+            path, _, depth = line.rpartition(" ")
+            if path and depth.isdigit():
+                yield path.rstrip(), int(depth)
+            else:
+                yield line, None
+
+
+def load_sections(file_path: str) -> List[str]:
+    """Return initial section paths listed in *file_path*.
+
+    Each non-empty line in the file is considered a relative path that
+    should be crawled, optionally followed by a maximum link depth (see
+    :func:`load_section_depths`). Blank lines are ignored.
+    """
+    return [path for path, _ in _section_lines(file_path)]
+
+
+def load_section_depths(file_path: str) -> Dict[str, int]:
+    """Return the maximum link depth given for sections in *file_path*.
+
+    A line such as ``novedades 2`` limits the crawl of that section to pages
+    at most two links away from it. Only a trailing integer is read as a
+    depth; sections without one are omitted.
+    """
+    return {path: depth for path, depth in _section_lines(file_path) if depth is not None}
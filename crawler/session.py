@@ -0,0 +1,129 @@
+"""Factory for ``requests`` sessions tuned for concurrent crawling.
+
+A plain :class:`requests.Session` keeps at most ten pooled connections per
+host, so with more worker threads the extra connections are discarded after
+each request and the next one pays for a new TCP and TLS handshake.
+:func:`make_session` sizes the pool from the number of workers, mounts a
+:class:`~urllib3.util.retry.Retry` policy for transient failures of
+idempotent requests and applies a default timeout to every request that does
+not set one.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 30.0)
+"""Default ``(connect, read)`` timeout in seconds."""
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+"""Responses retried by the adapter before being returned to the caller."""
+
+MIN_POOL_SIZE = 10
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTP adapter applying ``timeout`` to requests that do not pass one."""
+
+    def __init__(self, *args, timeout: float | Tuple[float, float] | None = DEFAULT_TIMEOUT, **kwargs) -> None:
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def make_retry(
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    statuses: Iterable[int] = RETRY_STATUSES,
+) -> Retry:
+    """Return the retry policy mounted by :func:`configure_session`.
+
+    Only idempotent methods are retried, so a login ``POST`` is never sent
+    twice by the adapter.  ``Retry-After`` headers are honoured and the last
+    response is returned instead of raising, leaving the decision to
+    ``raise_for_status``.
+    """
+
+    return Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=tuple(statuses),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def configure_session(
+    session: requests.Session,
+    max_workers: int = 4,
+    *,
+    pool_size: int | None = None,
+    keep_alive: bool = True,
+    retries: int | Retry | None = 3,
+    backoff_factor: float = 0.5,
+    timeout: float | Tuple[float, float] | None = DEFAULT_TIMEOUT,
+) -> requests.Session:
+    """Mount pooled, retrying adapters on *session* and return it.
+
+    Parameters
+    ----------
+    session:
+        Session to configure. Cookies and headers already set are kept.
+    max_workers:
+        Number of threads sharing the session. The connection pool per host
+        is sized to match so no worker has to open a fresh connection.
+    pool_size:
+        Explicit connections kept per host, overriding ``max_workers``.
+    keep_alive:
+        When false every request asks the server to close the connection.
+    retries:
+        Number of retries for connection errors and :data:`RETRY_STATUSES`,
+        a ready :class:`~urllib3.util.retry.Retry`, or ``None``/``0`` to
+        disable retrying in the adapter. Use ``0`` for sessions whose calls
+        are already retried, such as those passed to the
+        :mod:`crawler.network` helpers, or paced by a
+        :class:`~crawler.ratelimit.RateController`, which has to see every
+        429/5xx response; otherwise each layer multiplies the other's
+        attempts.
+    backoff_factor:
+        Base of the exponential backoff between adapter retries.
+    timeout:
+        Default ``(connect, read)`` timeout for requests that do not pass
+        their own. ``None`` waits indefinitely.
+    """
+
+    size = pool_size if pool_size is not None else max(MIN_POOL_SIZE, max_workers)
+    if isinstance(retries, Retry):
+        max_retries = retries
+    elif retries:
+        max_retries = make_retry(retries, backoff_factor)
+    else:
+        max_retries = 0
+    adapter = TimeoutHTTPAdapter(
+        timeout=timeout,
+        pool_maxsize=size,
+        max_retries=max_retries,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def make_session(max_workers: int = 4, **options) -> requests.Session:
+    """Return a new :class:`requests.Session` set up by :func:`configure_session`."""
+
+    return configure_session(requests.Session(), max_workers, **options)
@@ -0,0 +1,193 @@
+"""URL canonicalisation and memory-compact visited sets."""
+from __future__ import annotations
+
+import hashlib
+import math
+from array import array
+from typing import Iterable, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """Return a canonical form of *url* used to detect duplicates.
+
+    The scheme and host are lower-cased, default ports and the fragment are
+    dropped, query parameters are sorted and a trailing slash is removed
+    from non-root paths. The result is only meant as a deduplication key;
+    the crawler keeps fetching the URL as found.
+    """
+
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if ":" in host:
+        host = f"[{host}]"
+    userinfo, _, _ = parts.netloc.rpartition("@")
+    netloc = f"{userinfo}@{host}" if userinfo else host
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        netloc += f":{port}"
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def url_fingerprint(url: str) -> int:
+    """Return a non-zero 64-bit fingerprint of the canonical form of *url*."""
+
+    digest = hashlib.blake2b(canonicalize_url(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class CanonicalUrlSet:
+    """Exact set of canonical URL strings."""
+
+    def __init__(self, urls: Iterable[str] = ()) -> None:
+        self._urls = set()
+        self.update(urls)
+
+    def add(self, url: str) -> None:
+        self._urls.add(canonicalize_url(url))
+
+    def update(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self.add(url)
+
+    def __contains__(self, url: object) -> bool:
+        return isinstance(url, str) and canonicalize_url(url) in self._urls
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+
+class FingerprintSet:
+    """Set of URLs stored as 64-bit fingerprints in an open-addressing table.
+
+    Each entry costs 16 bytes at the maximum load factor of one half, instead
+    of a full string plus a hash-table slot. Two different canonical URLs
+    share a fingerprint with probability about ``n**2 / 2**65``, which is
+    negligible at crawl scale.
+    """
+
+    def __init__(self, urls: Iterable[str] = (), capacity: int = 1024) -> None:
+        size = 8
+        while size < capacity * 2:
+            size *= 2
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._len = 0
+        self.update(urls)
+
+    def _index(self, fp: int) -> int:
+        slots, mask = self._slots, self._mask
+        i = fp & mask
+        while slots[i] and slots[i] != fp:
+            i = (i + 1) & mask
+        return i
+
+    def _grow(self) -> None:
+        old = self._slots
+        self._slots = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._slots) - 1
+        for fp in old:
+            if fp:
+                self._slots[self._index(fp)] = fp
+
+    def add(self, url: str) -> None:
+        fp = url_fingerprint(url)
+        i = self._index(fp)
+        if not self._slots[i]:
+            self._slots[i] = fp
+            self._len += 1
+            if self._len * 2 > len(self._slots):
+                self._grow()
+
+    def update(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self.add(url)
+
+    def __contains__(self, url: object) -> bool:
+        if not isinstance(url, str):
+            return False
+        return bool(self._slots[self._index(url_fingerprint(url))])
+
+    def __len__(self) -> int:
+        return self._len
+
+
+class BloomUrlSet:
+    """Bloom filter of canonical URLs sized for *capacity* entries.
+
+    Uses about ``1.44 * log2(1 / error_rate)`` bits per URL. Membership tests
+    may return false positives at roughly *error_rate*, so a few URLs are
+    never crawled. ``len`` counts the URLs that were not already reported as
+    present when added.
+    """
+
+    def __init__(self, urls: Iterable[str] = (), capacity: int = 1_000_000, error_rate: float = 1e-4) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be 1 or greater")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self._bits_count = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hashes = max(1, round(self._bits_count / capacity * math.log(2)))
+        self._bits = bytearray((self._bits_count + 7) // 8)
+        self._len = 0
+        self.update(urls)
+
+    def _positions(self, url: str):
+        digest = hashlib.blake2b(canonicalize_url(url).encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self._bits_count
+        return [(h1 + i * h2) % m for i in range(self._hashes)]
+
+    def add(self, url: str) -> None:
+        new = False
+        for pos in self._positions(url):
+            byte, bit = divmod(pos, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self._len += 1
+
+    def update(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self.add(url)
+
+    def __contains__(self, url: object) -> bool:
+        if not isinstance(url, str):
+            return False
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(url))
+
+    def __len__(self) -> int:
+        return self._len
+
+
+SeenSet = Union[CanonicalUrlSet, FingerprintSet, BloomUrlSet]
+SEEN_SET_KINDS = ("exact", "fingerprint", "bloom")
+
+
+def make_seen_set(kind: str = "fingerprint", urls: Iterable[str] = (), capacity: int = 1_000_000) -> SeenSet:
+    """Return a visited set of the given *kind* filled with *urls*.
+
+    ``capacity`` is the number of URLs the Bloom filter is sized for; the
+    other kinds grow as needed.
+    """
+
+    if kind == "exact":
+        return CanonicalUrlSet(urls)
+    if kind == "fingerprint":
+        return FingerprintSet(urls)
+    if kind == "bloom":
+        return BloomUrlSet(urls, capacity=capacity)
+    raise ValueError(f"Unknown seen set kind: {kind}")
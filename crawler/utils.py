@@ -1,36 +1,156 @@
+from __future__ import annotations
+
+import email.utils
 import logging
+import random
+import threading
 import time
+from datetime import datetime, timezone
 from functools import wraps
 
+import requests
+
 
 logger = logging.getLogger(__name__)
 
+TIMEOUT_EXCEPTIONS = (TimeoutError, requests.Timeout)
+
+
+class RetryStats:
+    """Thread-safe counters describing how requests fared.
+
+    ``calls`` counts attempts, ``retries`` the attempts that were repeated,
+    ``timeouts`` the attempts that timed out and ``failures`` the calls that
+    failed for good.
+    """
+
+    FIELDS = ("calls", "retries", "timeouts", "failures")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[field] += amount
+
+    def observe_error(self, exc: BaseException) -> None:
+        """Count a failed attempt, noting whether it was a timeout."""
+        if isinstance(exc, TIMEOUT_EXCEPTIONS):
+            self.add("timeouts")
+
+    def observe_response(self, response) -> None:
+        """Count the retries urllib3 made while producing *response*."""
+        history = getattr(getattr(getattr(response, "raw", None), "retries", None), "history", None)
+        if history:
+            self.add("retries", len(history))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
 
-def retry(exceptions, tries=3, base_delay=1):
-    """Retry calling the decorated function using exponential backoff."""
+    def __str__(self) -> str:
+        return " ".join(f"{k}={v}" for k, v in self.snapshot().items())
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Return the delay requested by a ``Retry-After`` header on *exc*, if any.
+
+    Both forms of the header are understood: a number of seconds and an
+    HTTP date.
+    """
+    response = getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry(exceptions, tries=3, base_delay=1, *, max_delay=60.0, jitter=0.5,
+          budget=None, timeout=None, stats=None):
+    """Retry calling the decorated function using exponential backoff.
+
+    Parameters
+    ----------
+    exceptions: Exception types that trigger a retry.
+    tries: Maximum number of attempts.
+    base_delay: Delay before the second attempt; doubled after each failure
+        and capped at ``max_delay``.
+    jitter: Fraction of each delay that is randomised, so workers failing
+        together do not retry in lockstep. ``0`` keeps the exact backoff and
+        ``1`` draws the delay uniformly from ``[0, delay]``.
+    budget: Total seconds the call may take including waits. No retry is
+        scheduled that would end past the budget.
+    timeout: Default ``timeout`` keyword passed to the decorated function
+        when the caller gives none. It is shortened to what is left of the
+        budget.
+    stats: :class:`RetryStats` receiving the counters. Without one the
+        attempts are not counted.
+
+    A ``Retry-After`` header on the exception's response (see
+    :func:`retry_after`) raises the delay to what the server asked for.
+    """
     if tries < 1:
         raise ValueError("tries must be 1 or greater")
+    if not 0 <= jitter <= 1:
+        raise ValueError("jitter must be between 0 and 1")
 
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            # Nothing reports unshared counters, so a throwaway set is enough.
+            counters = stats if stats is not None else RetryStats()
+            started = time.monotonic()
             delay = base_delay
             last_exc = None
             for attempt in range(1, tries + 1):
+                call_kwargs = kwargs
+                if timeout is not None and kwargs.get("timeout") is None:
+                    call_kwargs = {**kwargs, "timeout": _bounded_timeout(timeout, budget, started)}
+                counters.add("calls")
                 try:
-                    return func(*args, **kwargs)
+                    return func(*args, **call_kwargs)
                 except exceptions as exc:  # type: ignore
                     logger.error(
                         "Attempt %s/%s failed with error: %s", attempt, tries, exc
                     )
+                    counters.observe_error(exc)
                     last_exc = exc
                     if attempt == tries:
                         break
-                    time.sleep(delay)
+                    wait = min(delay, max_delay) * (1 - jitter * random.random())
+                    requested = retry_after(exc)
+                    if requested is not None:
+                        wait = max(wait, requested)
+                    if budget is not None and time.monotonic() - started + wait >= budget:
+                        logger.error("Retry budget of %ss exhausted", budget)
+                        break
+                    counters.add("retries")
+                    time.sleep(wait)
                     delay *= 2
+            counters.add("failures")
             # Re-raise the last exception after exhausting retries
             raise last_exc
 
         return wrapper
 
     return decorator
+
+
+def _bounded_timeout(timeout, budget, started):
+    if budget is None:
+        return timeout
+    left = max(0.001, budget - (time.monotonic() - started))
+    if isinstance(timeout, tuple):
+        return tuple(min(t, left) for t in timeout)
+    return min(timeout, left)
@@ -1,8 +1,148 @@
+"""End-to-end crawl pipeline: fetch, parse, download and extract.
+
+``crawl`` logs in (when credentials are given), crawls the sections of the
+site with :func:`crawler.runner.run`, hands document links to a
+:class:`crawler.downloads.DownloadManager` and finally extracts the main
+content of every stored page with :mod:`extract_contenido`. The output
+directory is laid out as::
+
+    result.txt        run parameters
+    html/, textos/    raw HTML and cleaned text of every page
+    documentos/       downloaded attachments
+    contenido.jsonl   extracted content, one record per page
+    report.json       performance report
+"""
+
+import json
 from pathlib import Path
+from urllib.parse import urlsplit
 
+from crawler.auth import AuthSession
+from crawler.downloads import DownloadManager
+from crawler.metrics import CrawlMetrics
+from crawler.runner import run as run_crawl
+from crawler.scope import LinkFilter
+from crawler.session import make_session
+from crawler.utils import RetryStats
+from extract_contenido import ResultWriter, run_extraction
 
-def crawl(max_links=None, output_dir=Path("output")):
+
+def crawl(
+    max_links=None,
+    output_dir=Path("output"),
+    base_url=None,
+    sections_file=None,
+    session=None,
+    username=None,
+    password=None,
+    max_workers=4,
+    download_workers=4,
+):
+    """Run the pipeline and return its performance report.
+
+    Parameters
+    ----------
+    max_links:
+        Budget of pages visited by the crawl; it also caps the number of
+        attachments downloaded. ``None`` means no limit.
+    output_dir:
+        Directory receiving the layout described in the module docstring.
+    base_url:
+        Site to crawl. Without it only ``result.txt`` and an empty report
+        are written.
+    sections_file:
+        File listing the sections to start from (see
+        :func:`crawler.sections.load_sections`). Required with ``base_url``.
+    session:
+        Session to use. Otherwise one sized for ``max_workers`` is created
+        and, when ``username`` and ``password`` are given, logged in with
+        :class:`crawler.auth.AuthSession`.
+    max_workers:
+        Threads fetching pages and extracting content.
+    download_workers:
+        Threads downloading attachments.
+    """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     (output_dir / "result.txt").write_text(f"max_links={max_links}\n")
     print(f"Crawling with max_links={max_links}; saving to {output_dir}")
+
+    metrics = CrawlMetrics()
+    stats = RetryStats()
+    downloads = None
+    if base_url is not None:
+        if sections_file is None:
+            raise ValueError("sections_file is required to crawl base_url")
+        if session is None:
+            session = make_session(max_workers + download_workers)
+            if username is not None and password is not None:
+                with metrics.stage("login"):
+                    session = AuthSession(username, password, session=session).start()
+        host = urlsplit(base_url).hostname or ""
+        downloads = DownloadManager(
+            session,
+            str(output_dir / "documentos"),
+            max_workers=download_workers,
+            allow_hosts=[host] if host else [],
+            limit=max_links,
+        )
+        try:
+            with metrics.stage("crawl"):
+                run_crawl(
+                    base_url,
+                    str(sections_file),
+                    max_workers=max_workers,
+                    max_links=max_links,
+                    session=session,
+                    output_dir=output_dir,
+                    link_filter=LinkFilter.for_site(base_url, str(sections_file)),
+                    stats=stats,
+                    metrics=metrics,
+                    downloads=downloads,
+                )
+        finally:
+            # Waits for the queued attachments; timed as its own stage.
+            with metrics.stage("downloads"):
+                downloads.close()
+
+    # Only the pages stored by this run; earlier runs into the same
+    # directory left their own files in html/.
+    pages = sorted(metrics.saved_pages)
+    if pages:
+        with metrics.stage("extract"):
+            with ResultWriter(output_dir / "contenido.jsonl", "jsonl") as writer:
+                for path, res in run_extraction(pages, "utf-8", max_workers):
+                    writer.write(path, res)
+
+    report = metrics.report()
+    report["requests"] = stats.snapshot()
+    report["downloads"] = {
+        "files": downloads.files if downloads else 0,
+        "duplicates": downloads.duplicates if downloads else 0,
+        "bytes": downloads.bytes if downloads else 0,
+        "failures": downloads.failures if downloads else 0,
+    }
+    report["extracted"] = len(pages)
+    (output_dir / "report.json").write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(format_report(report))
+    return report
+
+
+def format_report(report):
+    """Return *report* as a short human readable summary."""
+    stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in report["stages"].items())
+    downloads = report["downloads"]
+    lines = [
+        f"Pages: {report['pages']} in {report['elapsed_seconds']:.2f}s "
+        f"({report['pages_per_second']:.2f} pages/s, {report['bytes']} bytes, "
+        f"{report['megabytes_per_second']:.3f} MB/s)",
+        f"Parse: {report['parse_seconds']:.3f}s total, {report['parse_ms_per_page']:.3f} ms/page",
+        f"Downloads: {downloads['files']} files, {downloads['bytes']} bytes, "
+        f"{downloads['duplicates']} duplicates, {downloads['failures']} failed",
+        "Requests: " + " ".join(f"{k}={v}" for k, v in report["requests"].items()),
+        f"Extracted: {report['extracted']} pages",
+    ]
+    if stages:
+        lines.append(f"Stages: {stages}")
+    return "\n".join(lines)
+
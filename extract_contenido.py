@@ -3,27 +3,37 @@
 
 This module provides a command line interface to iterate over HTML files
 and extract the main textual content found inside ``table.contenido``
-regions. It supports concurrent processing and writing to a single output
-file in ``txt``, ``md`` or ``jsonl`` formats.
+regions. It supports concurrent processing (threads or worker processes)
+and writing to a single output file in ``txt``, ``md`` or ``jsonl`` formats.
 """
 from __future__ import annotations
 
 import argparse
 import concurrent.futures
+import hashlib
+import heapq
 import html as html_module
 import json
 import logging
 import os
 import re
-from dataclasses import dataclass
+import tempfile
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from itertools import repeat
 from pathlib import Path
-from typing import Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, TextIO, Tuple
 import copy
 
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, NavigableString, Tag
 
 LOGGER = logging.getLogger(__name__)
 
+# Version of the extraction output stored in each manifest entry. Bump it
+# whenever a change to the extractor alters its results, so entries cached
+# by an older version are extracted again instead of being reused.
+EXTRACTOR_VERSION = 1
+
 
 @dataclass
 class ExtractResult:
@@ -64,11 +74,55 @@ def find_target_region(soup: BeautifulSoup) -> Tuple[Tag, str]:
     region = soup.select_one("div.novedadespop_mensaje")
     if region:
         return region, "novedadespop_mensaje"
-    candidates = soup.find_all(["div", "table", "section", "article", "main", "body"])
-    region = max(candidates, key=lambda t: len(t.get_text(" ", strip=True))) if candidates else soup
+    region = _largest_text_region(soup) or soup
     return region, "largest"
 
 
+_LARGEST_CANDIDATES = frozenset({"div", "table", "section", "article", "main", "body"})
+
+
+def _largest_text_region(soup: BeautifulSoup) -> Optional[Tag]:
+    """Return the candidate tag with the longest ``get_text(" ", strip=True)``.
+
+    Text lengths are computed bottom-up in a single post-order traversal: each
+    tag's length is the sum of its stripped strings plus one separator between
+    every pair of them, so every node is visited once instead of once per
+    enclosing candidate.  Ties go to the first candidate in document order,
+    as with ``max`` over ``find_all``.
+    """
+
+    types = Tag.MAIN_CONTENT_STRING_TYPES
+    best: Optional[Tag] = None
+    best_key = (-1, 0)
+    order = 0
+    # Frames are [tag, children iterator, text length, string count, preorder index].
+    stack: List[list] = [[soup, iter(soup.contents), 0, 0, order]]
+    while stack:
+        frame = stack[-1]
+        child = next(frame[1], _END)
+        if child is _END:
+            stack.pop()
+            tag, _, total, count, index = frame
+            if stack:
+                stack[-1][2] += total
+                stack[-1][3] += count
+            if tag.name in _LARGEST_CANDIDATES and tag is not soup:
+                key = (total + count - 1 if count else 0, -index)
+                if key > best_key:
+                    best, best_key = tag, key
+            continue
+        if isinstance(child, NavigableString):
+            if type(child) in types:
+                stripped = child.strip()
+                if stripped:
+                    frame[2] += len(stripped)
+                    frame[3] += 1
+        elif isinstance(child, Tag):
+            order += 1
+            stack.append([child, iter(child.contents), 0, 0, order])
+    return best
+
+
 def find_date(soup: BeautifulSoup) -> Optional[str]:
     """Return the text contained in ``td.novedadespop_fecha`` if present."""
 
@@ -104,6 +158,9 @@ def extract_from_region(region: Tag) -> Tuple[Optional[str], str]:
     The function concatenates the text contents of descendant tables with
     ``role="presentation"`` in document order. When no such tables exist, the
     entire region's text is extracted.
+
+    This copy-based implementation is kept as the reference for
+    :func:`render_region`, which :func:`extract_text` uses instead.
     """
 
     region = copy.copy(region)  # work on a copy to avoid mutating the soup
@@ -123,6 +180,84 @@ def extract_from_region(region: Tag) -> Tuple[Optional[str], str]:
     return title, text
 
 
+_SKIP_TAGS = frozenset({"script", "style", "noscript", "header", "footer", "nav"})
+_BLOCK_TAGS = frozenset(["p", "div", "table", "tr", "td", "li"] + [f"h{i}" for i in range(1, 7)])
+_END = object()
+
+
+def render_region(region: Tag) -> Tuple[Optional[str], str]:
+    """Extract title and text from *region* in a single read-only pass.
+
+    Produces the same output as :func:`extract_from_region` without copying
+    or mutating the tree.  The walk skips the subtrees removed by
+    :func:`_cleanup_region`, renders ``<br>`` as a newline and appends a
+    newline after block-level tags.  Text is collected into one buffer per
+    capture root (the region, the first ``.novedadespop_titulo`` element and
+    every ``table[role="presentation"]``) so nested captures see the same
+    strings they would receive from ``get_text`` on a copy.
+    """
+
+    region_parts: List[str] = []
+    title_parts: Optional[List[str]] = None
+    tables: List[List[str]] = []
+    # (capture root, buffer, string types kept by ``root.get_text()``)
+    active: List[Tuple[Tag, List[str], Set[type]]] = []
+
+    def capture(root: Tag, buf: List[str]) -> None:
+        active.append((root, buf, root.interesting_string_types or Tag.MAIN_CONTENT_STRING_TYPES))
+
+    def newline_except(tag: Tag) -> None:
+        # Inserted newlines are plain ``NavigableString`` objects.
+        for root, buf, types in active:
+            if root is not tag and NavigableString in types:
+                buf.append("\n")
+
+    def release(tag: Tag) -> None:
+        while active[-1][0] is tag:
+            active.pop()
+
+    capture(region, region_parts)
+    iterators = [iter(region.contents)]
+    owners: List[Optional[Tag]] = [None]
+    while iterators:
+        child = next(iterators[-1], _END)
+        if child is _END:
+            iterators.pop()
+            tag = owners.pop()
+            if tag is not None:
+                if tag.name in _BLOCK_TAGS:
+                    newline_except(tag)
+                release(tag)
+            continue
+        if isinstance(child, NavigableString):
+            string_type = type(child)
+            for _, buf, types in active:
+                if string_type in types:
+                    buf.append(child)
+            continue
+        if not isinstance(child, Tag) or child.name in _SKIP_TAGS:
+            continue
+
+        if title_parts is None and "novedadespop_titulo" in child.get_attribute_list("class"):
+            title_parts = []
+            capture(child, title_parts)
+        if child.name == "table" and child.get("role") == "presentation":
+            tables.append([])
+            capture(child, tables[-1])
+
+        if child.name == "br":
+            # ``<br>`` is replaced by a newline together with any children.
+            newline_except(child)
+            release(child)
+            continue
+        iterators.append(iter(child.contents))
+        owners.append(child)
+
+    title = "".join(title_parts).strip() if title_parts is not None else None
+    parts = ["".join(buf) for buf in tables] if tables else ["".join(region_parts)]
+    return title, "\n".join(parts)
+
+
 def normalize_text(text: str) -> str:
     """Normalize whitespace and decode HTML entities."""
 
@@ -147,7 +282,7 @@ def extract_text(html: str) -> ExtractResult:
         soup = BeautifulSoup(html, "html.parser")
 
     region, fallback = find_target_region(soup)
-    title, text = extract_from_region(region)
+    title, text = render_region(region)
     text = normalize_text(text)
     date = find_date(soup)
     LOGGER.debug("Used region: %s", fallback)
@@ -161,38 +296,264 @@ def process_file(path: Path, encoding: str) -> ExtractResult:
         LOGGER.warning("Failed to process %s: %s", path, exc)
         return ExtractResult(title=None, date=None, text="", used_fallback="error")
 
-def aggregate_and_write(results: List[Tuple[Path, ExtractResult]], out_file: Path, fmt: str) -> None:
-    results.sort(key=lambda x: str(x[0]))
-    out_file.parent.mkdir(parents=True, exist_ok=True)
+def _format_record(res: ExtractResult, fmt: str) -> str:
+    """Return the ``txt``/``md`` representation of a single result."""
 
-    if fmt == "jsonl":
-        with out_file.open("w", encoding="utf-8") as handle:
-            for path, res in results:
-                obj = {"file": str(path), "date": res.date, "title": res.title, "text": res.text}
-                handle.write(json.dumps(obj, ensure_ascii=False) + "\n")
-        return
+    meta: List[str] = []
+    if res.date:
+        meta.append(res.date)
+    if res.title:
+        meta.append(f"# {res.title}" if fmt == "md" else res.title)
+    if meta:
+        content = "\n".join(meta) + "\n\n" + res.text
+    else:
+        content = res.text
+    return content.rstrip()
 
-    with out_file.open("w", encoding="utf-8") as handle:
-        for idx, (path, res) in enumerate(results):
-            meta: List[str] = []
-            if res.date:
-                meta.append(res.date)
-            if res.title:
-                meta.append(f"# {res.title}" if fmt == "md" else res.title)
-            if meta:
-                content = "\n".join(meta) + "\n\n" + res.text
-            else:
-                content = res.text
-            content = content.rstrip()
-            handle.write(content)
-            if idx != len(results) - 1:
-                handle.write("\n\n")
+
+class ResultWriter:
+    """Write extraction results to *out_file* as they are produced.
+
+    With ``order="completion"`` (the default) every record is written and
+    flushed as soon as it arrives, so a crash late in a run keeps everything
+    processed so far.  With ``order="path"`` records are buffered in runs of
+    at most *run_size* entries, each run is sorted and spilled to a temporary
+    file, and the runs are merged into the output on :meth:`close`; nothing
+    reaches *out_file* before then, so that mode trades crash safety for a
+    deterministic order.  Memory use is bounded by *run_size* in both modes.
+    """
+
+    def __init__(self, out_file: Path, fmt: str, order: str = "completion", run_size: int = 10000) -> None:
+        if order not in {"path", "completion"}:
+            raise ValueError(f"Unknown order: {order}")
+        if run_size < 1:
+            raise ValueError("run_size must be 1 or greater")
+        self.out_file = out_file
+        self.fmt = fmt
+        self.order = order
+        self.run_size = run_size
+        self.out_file.parent.mkdir(parents=True, exist_ok=True)
+        self._handle: Optional[TextIO] = None
+        self._written = 0
+        self._buffer: List[Tuple[str, str]] = []
+        self._runs: List[Path] = []
+        self._spill_dir: Optional[tempfile.TemporaryDirectory] = None
+        if order == "completion":
+            self._handle = self.out_file.open("w", encoding="utf-8")
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def write(self, path: Path, res: ExtractResult) -> None:
+        if self.order == "completion":
+            self._emit(str(path), res)
+            assert self._handle is not None
+            self._handle.flush()
+            return
+        record = {"file": str(path), **asdict(res)}
+        self._buffer.append((str(path), json.dumps(record, ensure_ascii=False)))
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def close(self) -> None:
+        if self.order == "path" and self._handle is None:
+            self._handle = self.out_file.open("w", encoding="utf-8")
+            try:
+                for key, res in self._merged():
+                    self._emit(key, res)
+            finally:
+                self._buffer.clear()
+                if self._spill_dir is not None:
+                    self._spill_dir.cleanup()
+                    self._spill_dir = None
+        if self._handle is not None and not self._handle.closed:
+            self._handle.close()
+
+    def _emit(self, file: str, res: ExtractResult) -> None:
+        assert self._handle is not None
+        if self.fmt == "jsonl":
+            obj = {"file": file, "date": res.date, "title": res.title, "text": res.text}
+            self._handle.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        else:
+            if self._written:
+                self._handle.write("\n\n")
+            self._handle.write(_format_record(res, self.fmt))
+        self._written += 1
+
+    def _spill(self) -> None:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.TemporaryDirectory(prefix=".runs-", dir=self.out_file.parent)
+        self._buffer.sort(key=lambda item: item[0])
+        run_path = Path(self._spill_dir.name) / f"run-{len(self._runs):05d}.jsonl"
+        with run_path.open("w", encoding="utf-8") as handle:
+            for _, line in self._buffer:
+                handle.write(line + "\n")
+        self._runs.append(run_path)
+        self._buffer.clear()
+
+    def _merged(self) -> Iterator[Tuple[str, ExtractResult]]:
+        self._buffer.sort(key=lambda item: item[0])
+        with ExitStack() as stack:
+            sources: List[Iterable[str]] = [
+                stack.enter_context(run.open("r", encoding="utf-8")) for run in self._runs
+            ]
+            sources.append(line for _, line in self._buffer)
+            records = (json.loads(line) for line in heapq.merge(*sources, key=_run_key))
+            for record in records:
+                file = record.pop("file")
+                yield file, ExtractResult(**record)
+
+
+def _run_key(line: str) -> str:
+    return json.loads(line)["file"]
+
+
+def aggregate_and_write(results: Iterable[Tuple[Path, ExtractResult]], out_file: Path, fmt: str) -> None:
+    """Write *results* to *out_file* sorted by path."""
+
+    with ResultWriter(out_file, fmt, order="path") as writer:
+        for path, res in results:
+            writer.write(path, res)
+
+
+class Manifest:
+    """Cache of previous extraction results keyed by file path.
+
+    Each entry stores the file's ``mtime_ns``, ``size`` and ``sha256``
+    together with the :class:`ExtractResult` it produced. A file whose stat
+    matches its entry is reused without being read; when only the stat
+    differs the content hash decides. Entries written with another encoding
+    or another :data:`EXTRACTOR_VERSION` are never reused. The manifest is
+    stored as JSON lines and replaced atomically on :meth:`save`; entries
+    for files not seen in the current run are dropped.
+    """
+
+    def __init__(self, path: Path, encoding: str) -> None:
+        self.path = path
+        self.encoding = encoding
+        self._entries: Dict[str, dict] = {}
+        self._current: Dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, path: Path, encoding: str) -> "Manifest":
+        manifest = cls(path, encoding)
+        if not path.exists():
+            return manifest
+        with path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    LOGGER.warning("Skipping corrupt manifest line in %s", path)
+                    continue
+                manifest._entries[entry["file"]] = entry
+        return manifest
+
+    def partition(
+        self, files: Iterable[Path]
+    ) -> Tuple[List[Tuple[Path, ExtractResult]], List[Path]]:
+        """Split *files* into cached ``(path, result)`` pairs and pending paths."""
+
+        cached: List[Tuple[Path, ExtractResult]] = []
+        pending: List[Path] = []
+        for path in files:
+            key = str(path)
+            stat = path.stat()
+            entry = self._entries.get(key)
+            if entry is not None and (entry.get("encoding"), entry.get("version")) != (
+                self.encoding,
+                EXTRACTOR_VERSION,
+            ):
+                entry = None
+            if entry is not None and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+                self._current[key] = entry
+                cached.append((path, ExtractResult(**entry["result"])))
+                continue
+            digest = _file_sha256(path)
+            if entry is not None and entry["sha256"] == digest:
+                entry = {**entry, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+                self._current[key] = entry
+                cached.append((path, ExtractResult(**entry["result"])))
+                continue
+            self._current[key] = {
+                "file": key,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": digest,
+                "encoding": self.encoding,
+                "version": EXTRACTOR_VERSION,
+                "result": None,
+            }
+            pending.append(path)
+        return cached, pending
+
+    def record(self, path: Path, res: ExtractResult) -> None:
+        """Store the result of a freshly processed *path*."""
+
+        entry = self._current.get(str(path))
+        if entry is None:
+            return
+        if res.used_fallback == "error":
+            # Leave failures out so they are retried on the next run.
+            del self._current[str(path)]
+            return
+        entry["result"] = asdict(res)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as handle:
+            for entry in self._current.values():
+                if entry["result"] is not None:
+                    handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+
+
+def _file_sha256(path: Path) -> str:
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
 
 
 def iter_files(base: Path, pattern: str) -> Iterable[Path]:
     return list(base.glob(pattern))
 
 
+def _default_chunksize(n_files: int, workers: int) -> int:
+    """Return a chunk size giving each worker process roughly four batches."""
+
+    return max(1, n_files // (max(1, workers) * 4))
+
+
+def run_extraction(
+    files: Sequence[Path],
+    encoding: str,
+    workers: int,
+    executor: str = "thread",
+    chunksize: Optional[int] = None,
+) -> Iterator[Tuple[Path, ExtractResult]]:
+    """Yield ``(path, result)`` pairs for *files* using the chosen executor.
+
+    ``thread`` mode yields results as they complete.  ``process`` mode sends
+    the files to worker processes in chunks of *chunksize* so parsing scales
+    with the number of cores; only the small :class:`ExtractResult` objects
+    travel back to the parent process.
+    """
+
+    if executor == "process":
+        size = chunksize or _default_chunksize(len(files), workers)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as ex:
+            yield from zip(files, ex.map(process_file, files, repeat(encoding), chunksize=size))
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as ex:
+        future_to_path = {ex.submit(process_file, path, encoding): path for path in files}
+        for fut in concurrent.futures.as_completed(future_to_path):
+            yield future_to_path[fut], fut.result()
+
+
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Extract Canton HTML content")
     parser.add_argument("--in", dest="input_dir", type=Path, required=True, help="Input directory")
@@ -201,6 +562,40 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument("--format", choices=["txt", "md", "jsonl"], default="txt")
     parser.add_argument("--encoding", default="utf-8")
     parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--executor",
+        choices=["thread", "process"],
+        default="thread",
+        help="Run extraction in threads or in worker processes",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Files per batch sent to each worker process (process executor only)",
+    )
+    parser.add_argument(
+        "--order",
+        choices=["completion", "path"],
+        default="completion",
+        help=(
+            "completion (default): write and flush each record as soon as it is extracted, "
+            "so a crash keeps the finished ones; path: write sorted by path with an external "
+            "merge sort, only when the run ends"
+        ),
+    )
+    parser.add_argument(
+        "--run-size",
+        type=int,
+        default=10000,
+        help="Records kept in memory before a sorted run is spilled to disk (--order path)",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help="Manifest file used to skip files unchanged since the previous run",
+    )
     parser.add_argument("--debug", action="store_true")
     return parser.parse_args(argv)
 
@@ -214,17 +609,23 @@ def main(argv: Optional[List[str]] = None) -> None:
         LOGGER.info("No files found for pattern %s", args.glob)
         return
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as ex:
-        future_to_path = {ex.submit(process_file, path, args.encoding): path for path in files}
-        results: List[Tuple[Path, ExtractResult]] = []
-        for fut in concurrent.futures.as_completed(future_to_path):
-            path = future_to_path[fut]
-            res = fut.result()
+    manifest = Manifest.load(args.manifest, args.encoding) if args.manifest else None
+    pending = files
+    with ResultWriter(args.out_file, args.format, order=args.order, run_size=args.run_size) as writer:
+        if manifest is not None:
+            cached, pending = manifest.partition(files)
+            LOGGER.info("Reusing %d cached results, extracting %d files", len(cached), len(pending))
+            for path, res in cached:
+                writer.write(path, res)
+        for path, res in run_extraction(pending, args.encoding, args.workers, args.executor, args.chunksize):
             if res.used_fallback != "contenido":
                 LOGGER.info("%s used fallback %s", path, res.used_fallback)
-            results.append((path, res))
+            writer.write(path, res)
+            if manifest is not None:
+                manifest.record(path, res)
 
-    aggregate_and_write(results, args.out_file, args.format)
+    if manifest is not None:
+        manifest.save()
 
 
 if __name__ == "__main__":  # pragma: no cover
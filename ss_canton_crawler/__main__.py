@@ -1,25 +1,61 @@
 import argparse
+import itertools
+import sys
 from concurrent.futures import ThreadPoolExecutor
-from .crawler import crawl
+from functools import partial
+from pathlib import Path
+
+from crawler.session import make_session
+
+from .crawler import crawl, crawl_batch, read_urls
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Simple Canton crawler")
-    parser.add_argument("urls", nargs="+", help="URLs to crawl")
+    parser.add_argument("urls", nargs="*", help="URLs to crawl")
     parser.add_argument(
         "--threads",
         type=int,
         default=1,
         help="Number of worker threads to use",
     )
+    parser.add_argument(
+        "--input",
+        help="File with one URL per line ('-' for stdin); enables batch mode",
+    )
+    parser.add_argument(
+        "--output",
+        help="JSONL file for batch results (default: stdout); enables batch mode",
+    )
     args = parser.parse_args()
 
+    if args.input or args.output:
+        urls = iter(args.urls)
+        source = None
+        if args.input == "-":
+            urls = itertools.chain(urls, read_urls(sys.stdin))
+        elif args.input:
+            source = open(args.input, encoding="utf-8")
+            urls = itertools.chain(urls, read_urls(source))
+        out = Path(args.output).open("w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            failures = crawl_batch(urls, out, workers=args.threads)
+        finally:
+            if source is not None:
+                source.close()
+            if out is not sys.stdout:
+                out.close()
+        sys.exit(1 if failures else 0)
+
+    if not args.urls:
+        parser.error("no URLs given; pass them as arguments or with --input")
+    session = make_session(args.threads)
     if args.threads > 1:
         with ThreadPoolExecutor(max_workers=args.threads) as executor:
-            executor.map(crawl, args.urls)
+            executor.map(partial(crawl, session=session), args.urls)
     else:
         for url in args.urls:
-            crawl(url)
+            crawl(url, session)
 
 
 if __name__ == "__main__":
@@ -2,26 +2,30 @@
 
 from __future__ import annotations
 
-import json
-import tempfile
 from pathlib import Path
 
 import requests
 
-from crawler.auth import LoginError, login as _core_login
+from crawler.auth import AuthSession, LoginError
 
-__all__ = ["login", "LoginError"]
+__all__ = ["AuthSession", "login", "LoginError"]
 
 
-def login(username: str, password: str, base_url: str) -> requests.Session:
+def login(
+    username: str,
+    password: str,
+    base_url: str,
+    session: requests.Session | None = None,
+    cookie_file: str | Path | None = None,
+) -> AuthSession:
     """Authenticate against the SS Canton service.
 
-    This wrapper funnels the provided ``username`` and ``password`` through
-    :func:`crawler.auth.login` so the retry and error handling logic of the
-    core implementation is reused.  Credentials are written to a temporary JSON
-    file compatible with the core function interface.  ``base_url`` is accepted
-    for API backwards compatibility, but the underlying authentication endpoint
-    is defined by the core implementation.
+    The credentials are handed to :class:`crawler.auth.AuthSession`, so the
+    retry and error handling logic of the core implementation is reused and
+    the session logs in again by itself if the site expires it mid-crawl.
+    ``base_url`` is accepted for API backwards compatibility, but the
+    underlying authentication endpoint is defined by the core
+    implementation.
 
     Parameters
     ----------
@@ -31,19 +35,19 @@ def login(username: str, password: str, base_url: str) -> requests.Session:
         Account password.
     base_url:
         Base URL of the SS Canton service. Currently unused.
+    session:
+        Session to authenticate, e.g. one from
+        :func:`crawler.session.make_session` sized for the crawler's
+        workers. A default pooled session is created when omitted.
+    cookie_file:
+        Optional JSON file where cookies are kept between runs. When it
+        holds cookies from a previous run no login request is made up front.
 
     Returns
     -------
-    requests.Session
-        Authenticated session ready to perform subsequent requests.
+    AuthSession
+        Authenticated session ready to perform subsequent requests. It
+        behaves like a ``requests.Session``.
     """
 
-    creds = {"user": username, "password": password}
-    with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False) as fh:
-        json.dump(creds, fh)
-        creds_path = fh.name
-
-    try:
-        return _core_login(requests.Session(), creds_path)
-    finally:
-        Path(creds_path).unlink(missing_ok=True)
+    return AuthSession(username, password, session=session, cookie_file=cookie_file).start()
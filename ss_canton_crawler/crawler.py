@@ -2,15 +2,89 @@
 
 from __future__ import annotations
 
+import json
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, TextIO
+
 import requests
 
-from crawler.parser import extract_text
+from crawler.parser import extract_text, parse_document
+from crawler.session import make_session
 
-__all__ = ["crawl"]
+__all__ = ["crawl", "crawl_batch", "extract", "read_urls"]
 
 
-def crawl(url: str) -> None:
+def crawl(url: str, session: requests.Session | None = None) -> None:
     """Fetch ``url`` and print the cleaned text extracted from its HTML."""
-    response = requests.get(url)
+    response = (session or requests).get(url)
     response.raise_for_status()
     print(extract_text(response.text))
+
+
+def extract(url: str, session: requests.Session) -> Dict[str, object]:
+    """Fetch ``url`` and return its JSONL record.
+
+    Failures are reported in the ``error`` field instead of being raised, so
+    one bad URL does not stop a batch.
+    """
+    record: Dict[str, object] = {"url": url, "status": None, "title": None, "text": None, "error": None}
+    try:
+        response = session.get(url)
+        record["status"] = response.status_code
+        response.raise_for_status()
+    except requests.RequestException as exc:
+        record["error"] = str(exc)
+        return record
+    document = parse_document(response.text)
+    record["title"] = document.title or ""
+    record["text"] = document.text
+    return record
+
+
+def read_urls(stream: TextIO) -> Iterator[str]:
+    """Yield the URLs in ``stream``, one per line, skipping blanks and ``#`` comments."""
+    for line in stream:
+        url = line.strip()
+        if url and not url.startswith("#"):
+            yield url
+
+
+def crawl_batch(
+    urls: Iterable[str],
+    out: TextIO,
+    workers: int = 8,
+    session: requests.Session | None = None,
+    max_pending: int | None = None,
+) -> int:
+    """Extract every URL in ``urls`` and write one JSON line per URL to ``out``.
+
+    Up to ``workers`` URLs are fetched at a time through one pooled session
+    (see :func:`crawler.session.make_session`).  Records are written in the
+    order of ``urls`` regardless of which fetch finishes first, so the output
+    is repeatable.  At most ``max_pending`` URLs (``4 * workers`` by default)
+    are read ahead of the oldest unwritten one, keeping memory bounded for
+    arbitrarily long inputs such as a pipe.  Returns the number of URLs that
+    failed.
+    """
+    session = session or make_session(workers)
+    limit = max_pending or 4 * workers
+    pending: Deque[Future] = deque()
+    failures = 0
+
+    def flush(keep: int) -> None:
+        nonlocal failures
+        while len(pending) > keep:
+            record = pending.popleft().result()
+            if record["error"] is not None:
+                failures += 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for url in urls:
+            pending.append(executor.submit(extract, url, session))
+            if len(pending) >= limit:
+                flush(limit - 1)
+        flush(0)
+    return failures
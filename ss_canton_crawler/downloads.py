@@ -1,5 +1,5 @@
 """Download helpers delegating to :mod:`crawler.downloads`."""
 
-from crawler.downloads import download_file
+from crawler.downloads import DownloadManager, download_file
 
-__all__ = ["download_file"]
+__all__ = ["DownloadManager", "download_file"]
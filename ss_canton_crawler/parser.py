@@ -4,19 +4,17 @@ from __future__ import annotations
 
 from typing import Dict
 
-from bs4 import BeautifulSoup
+from crawler.parser import ParsedDocument, parse_document
 
-from crawler.parser import extract_text
-
-__all__ = ["parse_content"]
+__all__ = ["ParsedDocument", "parse_content", "parse_document"]
 
 
 def parse_content(html: str) -> Dict[str, str]:
     """Parse HTML content extracted from SS Canton pages.
 
-    The function builds upon :func:`crawler.parser.extract_text` to obtain a
-    cleaned representation of the document while also returning the page title
-    for convenience.
+    The function builds upon :func:`crawler.parser.parse_document`, so the
+    page title and the cleaned representation of the document come from a
+    single parse of ``html``.
 
     Parameters
     ----------
@@ -30,9 +28,9 @@ def parse_content(html: str) -> Dict[str, str]:
         least ``title`` and ``text`` keys.
     """
 
-    soup = BeautifulSoup(html, "html.parser")
+    document = parse_document(html)
     data = {
-        "title": soup.title.string if soup.title else "",
-        "text": extract_text(html),
+        "title": document.title or "",
+        "text": document.text,
     }
     return data
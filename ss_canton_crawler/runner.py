@@ -6,7 +6,12 @@ import argparse
 from pathlib import Path
 
 from . import auth, downloads, logging_config, parser
+from crawler.async_runner import run as async_run
+from crawler.ratelimit import RateController
 from crawler.runner import run as core_run
+from crawler.scope import LinkFilter
+from crawler.session import make_session
+from crawler.urls import SEEN_SET_KINDS
 
 
 def run(
@@ -17,11 +22,20 @@ def run(
     sections: str | Path | None = None,
     max_workers: int = 4,
     max_links: int | None = None,
+    engine: str = "threads",
+    rate: float | None = None,
+    http_cache: str | Path | None = None,
+    checkpoint: str | Path | None = None,
+    resume: bool = False,
+    seen: str = "fingerprint",
+    scope: bool = True,
+    cookie_file: str | Path | None = None,
 ) -> None:
     """Execute the crawler workflow.
 
     When ``sections`` is provided the full crawling engine from the ``crawler``
-    package is invoked to traverse all links listed in that file.  Otherwise a
+    package is invoked to traverse all links listed in that file, storing each
+    page's HTML and cleaned text under ``output_dir``.  Otherwise a
     single page at ``base_url`` is downloaded and parsed.
 
     Parameters
@@ -38,24 +52,79 @@ def run(
         Optional path to a file containing initial sections to crawl. Both
         relative and absolute paths are supported.
     max_workers:
-        Number of worker threads for the full crawler.
+        Number of worker threads for the full crawler. The HTTP connection
+        pool of the session is sized to match.
     max_links:
         Optional limit of total links visited by the full crawler.
+    engine:
+        ``"threads"`` for the thread pool engine or ``"asyncio"`` for the
+        asynchronous engine, where ``max_workers`` bounds the requests in
+        flight.
+    rate:
+        Optional maximum requests per second to the site. When set, the
+        thread engine paces requests and adapts its concurrency (up to
+        ``max_workers``) to the server's latency and errors.
+    http_cache:
+        Optional directory for the conditional GET cache used by the thread
+        engine, so unchanged pages are not downloaded again.
+    checkpoint:
+        Optional SQLite file where the thread engine periodically saves its
+        frontier and visited URLs.
+    resume:
+        Continue an interrupted crawl from ``checkpoint``.
+    seen:
+        Visited-set implementation for the thread engine: ``"exact"``,
+        ``"fingerprint"`` or ``"bloom"`` (see :mod:`crawler.urls`).
+    scope:
+        When true (the default) only links on the ``base_url`` host are
+        followed, skipping binary assets, ``mailto:``/``javascript:`` links,
+        logout links and links deeper than the depth given for their
+        section (see :class:`crawler.scope.LinkFilter`).
+    cookie_file:
+        Optional JSON file where the session cookies are kept between runs,
+        so a still valid login is reused instead of posting the credentials
+        again. An expired login is renewed automatically during the crawl
+        (see :class:`crawler.auth.AuthSession`).
     """
 
     logging_config.setup_logging()
-    session = auth.login(username, password, base_url)
+    # With a rate limit the controller backs off on 429/5xx responses, so
+    # the adapter must return them instead of retrying.
+    session = make_session(max_workers, retries=0) if rate else make_session(max_workers)
+    session = auth.login(username, password, base_url, session=session, cookie_file=cookie_file)
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
     if sections:
         sections_path = Path(sections).expanduser().resolve()
+        link_filter = LinkFilter.for_site(base_url, str(sections_path)) if scope else None
+        if engine == "asyncio":
+            async_run(
+                base_url,
+                str(sections_path),
+                max_links=max_links,
+                session=session,
+                concurrency=max_workers,
+                output_dir=output_dir,
+                link_filter=link_filter,
+            )
+            return
+        controller = None
+        if rate:
+            controller = RateController(rate=rate, burst=max(1.0, rate), max_concurrency=max_workers)
         core_run(
             base_url,
             str(sections_path),
             max_workers=max_workers,
             max_links=max_links,
             session=session,
+            output_dir=output_dir,
+            rate=controller,
+            cache_dir=http_cache,
+            checkpoint=checkpoint,
+            resume=resume,
+            seen=seen,
+            link_filter=link_filter,
         )
         return
 
@@ -76,7 +145,27 @@ def main() -> None:
     argp.add_argument("--sections", help="file with initial sections to crawl")
     argp.add_argument("--max-workers", type=int, default=4, help="number of worker threads")
     argp.add_argument("--max-links", type=int, help="limit the number of visited links")
+    argp.add_argument("--engine", choices=["threads", "asyncio"], default="threads", help="crawl engine")
+    argp.add_argument("--rate", type=float, help="maximum requests per second (threads engine)")
+    argp.add_argument("--http-cache", help="directory for the HTTP revalidation cache (threads engine)")
+    argp.add_argument("--checkpoint", help="SQLite file where crawl progress is saved (threads engine)")
+    argp.add_argument("--resume", action="store_true", help="resume the crawl saved in --checkpoint")
+    argp.add_argument(
+        "--seen-set",
+        choices=SEEN_SET_KINDS,
+        default="fingerprint",
+        help="visited URL set implementation (threads engine)",
+    )
+    argp.add_argument(
+        "--no-scope",
+        dest="scope",
+        action="store_false",
+        help="follow every link, including off-site links and binary assets",
+    )
+    argp.add_argument("--cookies", help="JSON file where session cookies are kept between runs")
     args = argp.parse_args()
+    if args.resume and not args.checkpoint:
+        argp.error("--resume requires --checkpoint")
 
     run(
         args.user,
@@ -86,6 +175,14 @@ def main() -> None:
         sections=Path(args.sections) if args.sections else None,
         max_workers=args.max_workers,
         max_links=args.max_links,
+        engine=args.engine,
+        rate=args.rate,
+        http_cache=args.http_cache,
+        checkpoint=args.checkpoint,
+        resume=args.resume,
+        seen=args.seen_set,
+        scope=args.scope,
+        cookie_file=args.cookies,
     )
 
 
@@ -1,6 +1,34 @@
 import sys
+import threading
+from http.server import ThreadingHTTPServer
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def local_server():
+    """Serve request handler classes on 127.0.0.1 for the duration of a test.
+
+    Call the fixture with a ``BaseHTTPRequestHandler`` subclass to start a
+    ``ThreadingHTTPServer`` on a free port; it returns the base URL without a
+    trailing slash. Every server started is shut down after the test.
+    """
+
+    servers = []
+
+    def start(handler):
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        httpd.daemon_threads = True
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        return f"http://127.0.0.1:{httpd.server_port}"
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,132 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+pytest.importorskip("aiohttp")
+
+from yarl import URL
+
+from crawler import async_runner
+from crawler.async_runner import copy_cookies, run
+
+
+PAGES = {
+    "/home": "<a href='/a'>a</a><a href='/b'>b</a><a href='/missing'>x</a>",
+    "/a": "<p>Pagina A</p><a href='/b'>b</a><a href='/c'>c</a>",
+    "/b": "<p>Pagina B</p><a href='/home'>home</a>",
+    "/c": "<p>Pagina C</p>",
+    "/elsewhere": "<a href='http://localhost:{port}/c'>c</a>",
+    "/broken": "<a href='http://[bad'>bad</a><a href='/c'>c</a>",
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    cookies = []
+
+    def do_GET(self):
+        Handler.cookies.append(self.headers.get("Cookie"))
+        body = PAGES.get(self.path, "").replace("{port}", str(self.server.server_port)) or None
+        if body is None:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(local_server):
+    Handler.cookies = []
+    return local_server(Handler) + "/"
+
+
+def test_async_run_crawls_site_and_stores_pages(server, tmp_path):
+    sections = tmp_path / "sections.txt"
+    sections.write_text("home\n", encoding="utf-8")
+    session = requests.Session()
+    session.cookies.set("PHPSESSID", "abc")
+
+    visited = run(server, str(sections), session=session, concurrency=2, output_dir=tmp_path / "out")
+
+    assert visited == {server + p for p in ("home", "a", "b", "c", "missing")}
+    texts = sorted(p.read_text(encoding="utf-8") for p in (tmp_path / "out" / "textos").iterdir())
+    assert texts == ["Pagina A b c", "Pagina B home", "Pagina C", "a b x"]
+    assert set(Handler.cookies) == {"PHPSESSID=abc"}
+
+
+def test_async_run_respects_max_links(server, tmp_path):
+    sections = tmp_path / "sections.txt"
+    sections.write_text("home\n", encoding="utf-8")
+    visited = run(server, str(sections), max_links=2)
+    assert visited == {server + "home", server + "a"}
+
+
+def test_copy_cookies_keeps_domain_and_path():
+    session = requests.Session()
+    session.cookies.set("PHPSESSID", "abc", domain="simplesolutions.com.ar", path="/elcanton")
+    session.cookies.set("lang", "es")
+
+    async def filtered(url):
+        jar = copy_cookies(session.cookies, "https://base.example/")
+        return {name: morsel.value for name, morsel in jar.filter_cookies(URL(url)).items()}
+
+    assert asyncio.run(filtered("https://simplesolutions.com.ar/elcanton/x")) == {"PHPSESSID": "abc"}
+    assert asyncio.run(filtered("https://simplesolutions.com.ar/otro")) == {}
+    assert asyncio.run(filtered("https://base.example/x")) == {"lang": "es"}
+    assert asyncio.run(filtered("https://evil.example/x")) == {}
+
+
+def test_async_run_does_not_send_cookies_to_other_hosts(server, tmp_path):
+    sections = tmp_path / "sections.txt"
+    sections.write_text("elsewhere\n", encoding="utf-8")
+    session = requests.Session()
+    session.cookies.set("PHPSESSID", "abc", domain="127.0.0.1")
+
+    visited = run(server, str(sections), session=session)
+
+    port = server.rsplit(":", 1)[1].rstrip("/")
+    assert visited == {server + "elsewhere", f"http://localhost:{port}/c"}
+    assert Handler.cookies == ["PHPSESSID=abc", None]
+
+
+def test_async_run_logs_failed_fetches(server, tmp_path, caplog):
+    sections = tmp_path / "sections.txt"
+    sections.write_text("missing\n", encoding="utf-8")
+    with caplog.at_level("WARNING", logger="crawler.async_runner"):
+        run(server, str(sections))
+    assert f"Failed to fetch {server}missing" in caplog.text
+
+
+def test_async_run_skips_malformed_links(server, tmp_path, caplog):
+    sections = tmp_path / "sections.txt"
+    sections.write_text("broken\n", encoding="utf-8")
+    with caplog.at_level("WARNING", logger="crawler.async_runner"):
+        visited = run(server, str(sections))
+    assert visited == {server + "broken", server + "c"}
+    assert Handler.cookies == [None, None]
+    assert "Skipping malformed link 'http://[bad'" in caplog.text
+
+
+def test_async_run_survives_page_errors(server, tmp_path, monkeypatch, caplog):
+    original = async_runner.parse_document
+
+    def parse_document(html):
+        if "Pagina B" in html:
+            raise RuntimeError("parser crashed")
+        return original(html)
+
+    monkeypatch.setattr(async_runner, "parse_document", parse_document)
+    sections = tmp_path / "sections.txt"
+    sections.write_text("home\n", encoding="utf-8")
+    run(server, str(sections), concurrency=1, output_dir=tmp_path / "out")
+    texts = sorted(p.read_text(encoding="utf-8") for p in (tmp_path / "out" / "textos").iterdir())
+    assert texts == ["Pagina A b c", "Pagina C", "a b x"]
+    assert f"Unhandled error while crawling {server}b" in caplog.text
@@ -1,8 +1,11 @@
 import json
+import threading
+from http.server import BaseHTTPRequestHandler
+
 import pytest
 from requests.exceptions import RequestException
 
-from crawler.auth import login, LoginError
+from crawler.auth import AuthSession, login, LoginError
 
 
 class DummyResponse:
@@ -48,3 +51,147 @@ def test_login_fails_after_retries(tmp_path, monkeypatch):
     monkeypatch.setattr("time.sleep", lambda x: None)
     with pytest.raises(LoginError):
         login(AlwaysFailSession(), str(creds))
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    """Pages require the cookie handed out by the last ``POST /``."""
+
+    lock = threading.Lock()
+    sid = None
+    logins = 0
+    deny_with = 302
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/":
+            self.send_error(404)
+            return
+        with SiteHandler.lock:
+            SiteHandler.logins += 1
+            SiteHandler.sid = f"s{SiteHandler.logins}"
+        self.send_response(200)
+        self.send_header("Set-Cookie", f"sid={SiteHandler.sid}; Path=/")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path == "/login":
+            body = b"<form>login</form>"
+        elif self.path == "/moved":
+            self.send_response(302)
+            self.send_header("Location", "/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        elif self.path.startswith("/forbidden"):
+            self.send_error(403)
+            return
+        elif SiteHandler.sid and f"sid={SiteHandler.sid}" in (self.headers.get("Cookie") or ""):
+            body = b"private"
+        elif SiteHandler.deny_with == 302:
+            self.send_response(302)
+            self.send_header("Location", "/login")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        else:
+            self.send_error(SiteHandler.deny_with)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site(local_server):
+    SiteHandler.sid = None
+    SiteHandler.logins = 0
+    SiteHandler.deny_with = 302
+    return local_server(SiteHandler)
+
+
+def test_auth_session_reuses_saved_cookies(site, tmp_path):
+    cookies = tmp_path / "cookies.json"
+    first = AuthSession("u", "p", cookie_file=cookies, login_url=site + "/", login_page=site + "/login").start()
+    assert first.get(site + "/page").text == "private"
+    assert SiteHandler.logins == 1
+
+    second = AuthSession("u", "p", cookie_file=cookies, login_url=site + "/", login_page=site + "/login").start()
+    assert second.get(site + "/page").text == "private"
+    assert second.logins == 0
+    assert SiteHandler.logins == 1
+
+
+@pytest.mark.parametrize("deny_with", [302, 401, 403])
+def test_auth_session_reauthenticates_once_when_expired(site, tmp_path, deny_with):
+    cookies = tmp_path / "cookies.json"
+    session = AuthSession("u", "p", cookie_file=cookies, login_url=site + "/", login_page=site + "/login", relogin_interval=0).start()
+    SiteHandler.deny_with = deny_with
+    SiteHandler.sid = "expired"
+
+    results = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        results.append(session.get(site + "/page").text)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["private"] * 8
+    assert session.logins == 2
+    assert "s2" in cookies.read_text()
+
+
+def test_auth_session_does_not_log_in_again_for_denied_pages(site):
+    session = AuthSession("u", "p", login_url=site + "/", login_page=site + "/login", relogin_interval=0).start()
+
+    assert session.get(site + "/forbidden").status_code == 403
+    assert session.logins == 2
+    assert session.get(site + "/forbidden").status_code == 403
+    assert session.logins == 2
+    assert session.get(site + "/page").text == "private"
+    assert SiteHandler.logins == 2
+
+
+def test_auth_session_rate_limits_relogins(site):
+    now = [0.0]
+    session = AuthSession("u", "p", login_url=site + "/", login_page=site + "/login", relogin_interval=60, clock=lambda: now[0]).start()
+
+    for i in range(5):
+        assert session.get(site + f"/forbidden{i}").status_code == 403
+    assert session.logins == 1
+
+    now[0] = 61.0
+    assert session.get(site + "/forbidden-late").status_code == 403
+    assert session.logins == 2
+    assert SiteHandler.logins == 2
+
+
+def test_auth_session_redirect_to_home_is_not_expired(site):
+    session = AuthSession("u", "p", login_url=site + "/", login_page=site + "/login", relogin_interval=0).start()
+
+    response = session.get(site + "/moved")
+    assert response.history and response.text == "private"
+    assert not session.is_expired(response)
+    assert session.logins == 1
+
+
+def test_auth_session_skips_expired_saved_cookies(site, tmp_path):
+    cookies = tmp_path / "cookies.json"
+    cookies.write_text(json.dumps([
+        {"name": "sid", "value": "old", "domain": "", "path": "/", "secure": False, "expires": 1},
+    ]))
+    session = AuthSession("u", "p", cookie_file=cookies, login_url=site + "/", login_page=site + "/login")
+
+    assert not session.load_cookies()
+    session.start()
+    assert session.logins == 1
+    assert [c.value for c in session.cookies] == ["s1"]
@@ -0,0 +1,40 @@
+import json
+
+from bs4 import BeautifulSoup
+
+from benchmarks import offline_crawl, parsers
+from benchmarks.mock_site import MockSite
+from extract_contenido import extract_text, find_target_region
+
+
+def test_mock_site_covers_every_region_layout():
+    site = MockSite(pages=6, attachments=2)
+    fallbacks = {extract_text(site.article(i)).used_fallback for i in range(6)}
+    assert fallbacks == {"contenido", "news-body", "novedadespop_mensaje"}
+
+
+def test_offline_benchmark_reports_every_stage(tmp_path, capsys):
+    out = tmp_path / "bench.json"
+    offline_crawl.main(["--pages", "12", "--attachments", "3", "--attachment-kib", "1", "--workers", "2", "--json", str(out)])
+
+    results = {r["stage"]: r for r in json.loads(out.read_text(encoding="utf-8"))}
+    assert results["crawl"]["items"] == 12 + 3
+    assert results["download"]["items"] == 3
+    assert results["extract"]["items"] == 15
+    assert results["crawl"]["p99_ms"] >= results["crawl"]["p50_ms"] > 0
+    assert results["extract"]["p50_ms"] is None
+    assert "items/s" in capsys.readouterr().out
+
+
+def test_parser_corpus_hits_every_region_fallback():
+    regions = {}
+    for name, html in parsers.corpus():
+        region, fallback = find_target_region(BeautifulSoup(html, "lxml"))
+        regions.setdefault(fallback, set()).add(region.name)
+    assert set(regions) == {"contenido", "news-body", "novedadespop_mensaje", "largest"}
+    # The empty page has no candidate tag, so the whole document is used.
+    assert "[document]" in regions["largest"]
+
+
+def test_parser_outputs_match_golden():
+    assert parsers.mismatches(parsers.corpus(), parsers.load_golden()) == []
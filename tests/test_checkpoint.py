@@ -0,0 +1,94 @@
+from crawler.checkpoint import CheckpointQueue, CrawlCheckpoint
+from crawler.runner import run
+
+
+class DummyResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+class SiteSession:
+    def __init__(self, pages, failing=()):
+        self.pages = pages
+        self.failing = set(failing)
+        self.fetched = []
+
+    def get(self, url: str) -> DummyResponse:
+        self.fetched.append(url)
+        if url in self.failing:
+            raise ConnectionError("unreachable")
+        return DummyResponse(self.pages.get(url, ""))
+
+
+PAGES = {
+    "http://example.com/home": "<a href='a'></a><a href='b'></a>",
+    "http://example.com/a": "<a href='c'></a>",
+}
+
+
+def test_checkpoint_records_finished_crawl(tmp_path):
+    sections = tmp_path / "sections.txt"
+    sections.write_text("home\n", encoding="utf-8")
+    db = tmp_path / "crawl.sqlite"
+
+    run("http://example.com/", str(sections), max_workers=2, session=SiteSession(PAGES), checkpoint=db)
+
+    visited, frontier = CrawlCheckpoint(db).load()
+    assert visited == {"http://example.com/" + p for p in ("home", "a", "b", "c")}
+    assert frontier == []
+
+
+def test_resume_continues_from_pending_urls(tmp_path):
+    sections = tmp_path / "sections.txt"
+    sections.write_text("home\n", encoding="utf-8")
+    db = tmp_path / "crawl.sqlite"
+
+    # State left behind by a crawl interrupted after fetching ``home``.
+    store = CrawlCheckpoint(db)
+    for path in ("home", "a", "b"):
+        store.add("http://example.com/" + path, "home")
+    store.done("http://example.com/home")
+    store.close()
+
+    session = SiteSession(PAGES)
+    run("http://example.com/", str(sections), max_workers=2, session=session, checkpoint=db, resume=True)
+
+    assert sorted(session.fetched) == ["http://example.com/a", "http://example.com/b", "http://example.com/c"]
+    visited, frontier = CrawlCheckpoint(db).load()
+    assert len(visited) == 4
+    assert frontier == []
+
+    session = SiteSession(PAGES)
+    run("http://example.com/", str(sections), max_workers=2, session=session, checkpoint=db)
+    assert len(session.fetched) == 4
+
+
+def test_failed_pages_are_retried_on_resume(tmp_path):
+    sections = tmp_path / "sections.txt"
+    sections.write_text("home\n", encoding="utf-8")
+    db = tmp_path / "crawl.sqlite"
+
+    session = SiteSession(PAGES, failing={"http://example.com/a"})
+    run("http://example.com/", str(sections), max_workers=2, session=session, checkpoint=db)
+    _, frontier = CrawlCheckpoint(db).load()
+    assert frontier == [("http://example.com/a", "home", 1)]
+
+    session = SiteSession(PAGES)
+    run("http://example.com/", str(sections), max_workers=2, session=session, checkpoint=db, resume=True)
+    assert sorted(session.fetched) == ["http://example.com/a", "http://example.com/c"]
+    assert CrawlCheckpoint(db).load()[1] == []
+
+
+def test_checkpoint_queue_records_items_outside_the_queue_lock(tmp_path):
+    class Recorder:
+        def add(self, *item):
+            held.append(q.mutex.locked())
+
+    held = []
+    q = CheckpointQueue(Recorder())
+    q.put(("http://example.com/a", "home", 0))
+    assert held == [False]
+    assert q.get() == ("http://example.com/a", "home", 0)
@@ -0,0 +1,78 @@
+import io
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from ss_canton_crawler import __main__ as cli
+from ss_canton_crawler.crawler import crawl_batch, read_urls
+
+
+class Handler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with Handler.lock:
+            Handler.active += 1
+            Handler.peak = max(Handler.peak, Handler.active)
+        try:
+            time.sleep(random.uniform(0, 0.02))
+            if self.path == "/missing":
+                self.send_error(404)
+                return
+            body = f"<title>T{self.path}</title><p>Texto {self.path}</p>".encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with Handler.lock:
+                Handler.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(local_server):
+    Handler.active = Handler.peak = 0
+    return local_server(Handler)
+
+
+def test_crawl_batch_writes_records_in_input_order(server):
+    urls = [f"{server}/p{i}" for i in range(40)] + [f"{server}/missing"]
+    out = io.StringIO()
+
+    failures = crawl_batch(iter(urls), out, workers=4, max_pending=6)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["url"] for r in records] == urls
+    assert records[0] == {"url": urls[0], "status": 200, "title": "T/p0", "text": "T/p0 Texto /p0", "error": None}
+    assert records[-1]["status"] == 404 and records[-1]["error"]
+    assert failures == 1
+    assert Handler.peak <= 4
+
+
+def test_read_urls_skips_blanks_and_comments():
+    stream = io.StringIO("http://a\n\n  # comment\n http://b \n")
+    assert list(read_urls(stream)) == ["http://a", "http://b"]
+
+
+def test_main_batch_mode_reads_stdin(server, tmp_path, monkeypatch):
+    out = tmp_path / "out.jsonl"
+    monkeypatch.setattr(sys, "stdin", io.StringIO(f"{server}/a\n{server}/b\n"))
+    monkeypatch.setattr(sys, "argv", ["prog", f"{server}/first", "--input", "-", "--output", str(out), "--threads", "3"])
+
+    with pytest.raises(SystemExit) as exc:
+        cli.main()
+
+    assert exc.value.code == 0
+    urls = [json.loads(line)["url"] for line in out.read_text(encoding="utf-8").splitlines()]
+    assert urls == [f"{server}/first", f"{server}/a", f"{server}/b"]
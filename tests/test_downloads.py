@@ -1,22 +1,45 @@
 import hashlib
+import os
+import threading
+import time
 
-from crawler.downloads import _sha256sum, download_file
+import pytest
+
+from crawler import downloads, network
+from crawler.downloads import INDEX_NAME, DownloadManager, HashIndex, _sha256sum, download_file
 
 
 class DummyResponse:
-    def __init__(self, content: bytes):
+    def __init__(self, content: bytes, fail_after: int | None = None):
         self.content = content
+        self.fail_after = fail_after
+        self.closed = False
 
     def raise_for_status(self) -> None:
         pass
 
+    def iter_content(self, chunk_size: int = 1):
+        for i in range(0, len(self.content), chunk_size):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise ConnectionError("connection dropped")
+            yield self.content[i:i + chunk_size]
+
+    def close(self) -> None:
+        self.closed = True
+
 
 class DummySession:
-    def __init__(self, content: bytes):
+    def __init__(self, content: bytes, fail_after: int | None = None):
         self.content = content
+        self.fail_after = fail_after
+        self.calls = []
+        self.responses = []
 
-    def get(self, url: str) -> DummyResponse:
-        return DummyResponse(self.content)
+    def get(self, url: str, **kwargs) -> DummyResponse:
+        self.calls.append(kwargs)
+        response = DummyResponse(self.content, self.fail_after)
+        self.responses.append(response)
+        return response
 
 
 def test_sha256sum(tmp_path):
@@ -34,3 +57,191 @@ def test_download_file_saves_and_deduplicates(tmp_path):
     path2 = download_file(session, "http://example.com/file.txt", "sec", str(tmp_path), counter)
     assert path2 == path1
     assert counter["sec"] == 1
+
+
+def test_download_file_streams_to_disk(tmp_path):
+    content = bytes(range(256)) * 1024
+    session = DummySession(content)
+    path = download_file(session, "http://example.com/big.bin", "sec", str(tmp_path), {})
+    assert path.read_bytes() == content
+    assert session.calls == [{"stream": True}]
+    assert session.responses[0].closed
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([path.name, INDEX_NAME])
+
+
+def test_download_file_duplicate_leaves_no_temp_file(tmp_path):
+    counter = {}
+    first = download_file(DummySession(b"same"), "http://example.com/a.txt", "sec", str(tmp_path), counter)
+    second = download_file(DummySession(b"same"), "http://example.com/b.txt", "sec", str(tmp_path), counter)
+    assert second == first
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([first.name, INDEX_NAME])
+
+
+def test_download_file_interrupted_transfer_is_discarded(tmp_path):
+    session = DummySession(b"x" * 300_000, fail_after=65536)
+    with pytest.raises(ConnectionError):
+        download_file(session, "http://example.com/file.txt", "sec", str(tmp_path), {})
+    assert [p.name for p in tmp_path.iterdir() if p.name != INDEX_NAME] == []
+
+
+def test_network_download_file_replaces_atomically(tmp_path, monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda s: None)
+    dest = tmp_path / "file.bin"
+    dest.write_bytes(b"old")
+    session = DummySession(b"x" * 300_000, fail_after=65536)
+    with pytest.raises(ConnectionError):
+        network.download_file(session, "http://example.com/file.bin", dest)
+    assert dest.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["file.bin"]
+
+    network.download_file(DummySession(b"new"), "http://example.com/file.bin", dest)
+    assert dest.read_bytes() == b"new"
+    assert [p.name for p in tmp_path.iterdir()] == ["file.bin"]
+
+
+def test_hash_index_avoids_rehashing(tmp_path, monkeypatch):
+    counter = {}
+    index = HashIndex.load(tmp_path)
+    first = download_file(DummySession(b"one"), "http://example.com/a.txt", "sec", str(tmp_path), counter, index)
+    download_file(DummySession(b"two"), "http://example.com/b.txt", "sec", str(tmp_path), counter, index)
+
+    calls = []
+    real = downloads._sha256sum
+    monkeypatch.setattr(downloads, "_sha256sum", lambda path: calls.append(path) or real(path))
+    reloaded = HashIndex.load(tmp_path)
+    assert calls == []
+    assert reloaded.find(hashlib.sha256(b"one").hexdigest()) == first
+    again = download_file(DummySession(b"one"), "http://example.com/c.txt", "sec", str(tmp_path), counter, reloaded)
+    assert again == first
+    assert counter["sec"] == 2
+
+
+def test_hash_index_reconciles_directory(tmp_path):
+    (tmp_path / "manual.txt").write_bytes(b"manual")
+    (tmp_path / "gone.txt").write_bytes(b"gone")
+    HashIndex.load(tmp_path)
+    (tmp_path / "gone.txt").unlink()
+    (tmp_path / "late.txt").write_bytes(b"late")
+
+    index = HashIndex.load(tmp_path)
+    assert index.find(hashlib.sha256(b"manual").hexdigest()) == tmp_path / "manual.txt"
+    assert index.find(hashlib.sha256(b"late").hexdigest()) == tmp_path / "late.txt"
+    assert index.find(hashlib.sha256(b"gone").hexdigest()) is None
+    assert "gone.txt" not in (tmp_path / INDEX_NAME).read_text()
+
+
+def test_hash_index_find_ignores_rewritten_file_of_same_size(tmp_path):
+    (tmp_path / "a.txt").write_bytes(b"one")
+    index = HashIndex.load(tmp_path)
+    stat = (tmp_path / "a.txt").stat()
+    (tmp_path / "a.txt").write_bytes(b"two")
+    os.utime(tmp_path / "a.txt", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert index.find(hashlib.sha256(b"one").hexdigest()) is None
+
+
+class SlowSession:
+    """Serve ``url -> bytes`` with a small delay so downloads overlap."""
+
+    def __init__(self, bodies, fail=()):
+        self.bodies = bodies
+        self.fail = set(fail)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url: str, **kwargs) -> DummyResponse:
+        with self.lock:
+            self.calls.append(url)
+            failing = url in self.fail
+            self.fail.discard(url)
+        time.sleep(0.02)
+        return DummyResponse(self.bodies[url], fail_after=0 if failing else None)
+
+
+def test_download_manager_allocates_unique_names(tmp_path):
+    bodies = {f"http://example.com/{i}.pdf": f"doc {i}".encode() for i in range(20)}
+    session = SlowSession(bodies)
+    with DownloadManager(session, str(tmp_path), max_workers=8) as manager:
+        futures = [manager.submit(url, "sec") for url in bodies]
+        paths = [f.result() for f in futures]
+    assert sorted(p.name for p in paths) == sorted(f"sec-{i}.pdf" for i in range(1, 21))
+    assert manager.counter["sec"] == 20
+    for url, path in zip(bodies, paths):
+        assert path.read_bytes() == bodies[url]
+
+
+def test_download_manager_deduplicates_urls_and_content(tmp_path):
+    bodies = {
+        "http://example.com/a.pdf": b"same",
+        "http://example.com/b.pdf": b"same",
+    }
+    session = SlowSession(bodies)
+    with DownloadManager(session, str(tmp_path), max_workers=4) as manager:
+        first = manager.submit("http://example.com/a.pdf", "sec")
+        assert manager.submit("http://example.com/a.pdf", "sec") is first
+        other = manager.submit("http://example.com/b.pdf", "sec")
+        assert first.result() == other.result()
+    assert sorted(session.calls) == sorted(bodies)
+    assert [p.name for p in tmp_path.iterdir() if p.name != INDEX_NAME] == ["sec-1.pdf"]
+
+
+def test_download_manager_retries_failed_url(tmp_path):
+    url = "http://example.com/a.pdf"
+    session = SlowSession({url: b"data"}, fail=[url])
+    with DownloadManager(session, str(tmp_path), max_workers=2) as manager:
+        with pytest.raises(ConnectionError):
+            manager.submit(url, "sec").result()
+        assert manager.submit(url, "sec").result().read_bytes() == b"data"
+    assert session.calls == [url, url]
+
+
+def test_download_manager_counts_failed_store(tmp_path, monkeypatch):
+    url = "http://example.com/a.pdf"
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    with DownloadManager(SlowSession({url: b"data"}), str(tmp_path)) as manager:
+        monkeypatch.setattr(downloads.os, "replace", failing_replace)
+        with pytest.raises(OSError):
+            manager.submit(url, "sec").result()
+        monkeypatch.undo()
+        assert manager.failures == 1
+        assert [p.name for p in tmp_path.iterdir()] == []
+        assert manager.submit(url, "sec").result().read_bytes() == b"data"
+
+
+def test_download_manager_stores_nested_sections(tmp_path):
+    url = "http://example.com/a.pdf"
+    with DownloadManager(SlowSession({url: b"data"}), str(tmp_path)) as manager:
+        path = manager.submit(url, "elcanton/novedades").result()
+    assert path == tmp_path / "elcanton" / "novedades-1.pdf"
+    index = HashIndex.load(tmp_path)
+    assert index.find(hashlib.sha256(b"data").hexdigest()) == path
+
+
+def test_managers_sharing_a_directory_never_overwrite_each_other(tmp_path):
+    bodies = {f"http://example.com/{i}.pdf": f"doc {i}".encode() for i in range(30)}
+    urls = list(bodies)
+    session = SlowSession(bodies)
+    with DownloadManager(session, str(tmp_path), max_workers=4) as first, \
+            DownloadManager(session, str(tmp_path), max_workers=4) as second:
+        assert first.index is second.index
+        futures = [first.submit(u, "sec") for u in urls[:15]] + [second.submit(u, "sec") for u in urls[15:]]
+        paths = [f.result() for f in futures]
+    assert len({p.name for p in paths}) == 30
+    assert sorted(p.read_bytes() for p in paths) == sorted(bodies.values())
+
+
+def test_download_file_stores_under_the_directory_lock(tmp_path):
+    index = downloads.hash_index(tmp_path)
+    result = []
+    with index.store_lock:
+        worker = threading.Thread(
+            target=lambda: result.append(download_file(DummySession(b"data"), "http://x/a.pdf", "sec", str(tmp_path), {}))
+        )
+        worker.start()
+        worker.join(0.2)
+        assert worker.is_alive() and not result
+    worker.join()
+    assert result[0].name == "sec-1.pdf"
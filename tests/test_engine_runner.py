@@ -1,6 +1,10 @@
+import json
 import os
+from http.server import BaseHTTPRequestHandler
 from pathlib import Path
 
+import pytest
+
 from engine import crawl as engine_crawl
 from runner import save_section_text
 
@@ -22,3 +26,73 @@ def test_save_section_text_writes_clean_text(tmp_path, monkeypatch):
     expected_path = tmp_path / "test_results" / "textos" / "greeting.txt"
     assert path.resolve() == expected_path
     assert path.read_text(encoding="utf-8") == "Hello"
+
+
+SITE = {
+    "/novedades": (
+        "text/html",
+        "<table class='contenido'><tr><td>Novedad principal</td></tr></table>"
+        "<a href='/nota1'>1</a><a href='/nota2'>2</a><a href='/docs/informe.pdf'>pdf</a>",
+    ),
+    "/nota1": ("text/html", "<div id='news-body'>Nota uno</div><a href='/docs/informe.pdf'>pdf</a>"),
+    "/nota2": ("text/html", "<div id='news-body'>Nota dos</div><a href='/nota1'>1</a>"),
+    "/docs/informe.pdf": ("application/pdf", "%PDF-1.4 informe"),
+}
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in SITE:
+            self.send_error(404)
+            return
+        ctype, body = SITE[self.path]
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site(local_server):
+    return local_server(SiteHandler) + "/"
+
+
+def test_engine_crawl_runs_full_pipeline(site, tmp_path, capsys):
+    sections = tmp_path / "sections.txt"
+    sections.write_text("novedades\n", encoding="utf-8")
+    output_dir = tmp_path / "out"
+
+    report = engine_crawl(max_links=10, output_dir=output_dir, base_url=site, sections_file=sections)
+
+    assert (output_dir / "result.txt").read_text() == "max_links=10\n"
+    assert report["pages"] == 3
+    assert report["bytes"] == sum(len(body) for ctype, body in SITE.values() if ctype == "text/html")
+    assert report["downloads"]["files"] == 1
+    assert report["requests"]["failures"] == 0
+    assert set(report["stages"]) == {"crawl", "downloads", "extract"}
+    assert json.loads((output_dir / "report.json").read_text(encoding="utf-8")) == report
+    assert len(list((output_dir / "textos").iterdir())) == 3
+    assert (output_dir / "documentos" / "novedades-1.pdf").read_text() == "%PDF-1.4 informe"
+    records = [json.loads(line) for line in (output_dir / "contenido.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert sorted(r["text"] for r in records) == ["Nota dos", "Nota uno", "Novedad principal"]
+    assert "pages/s" in capsys.readouterr().out
+
+
+def test_engine_crawl_extracts_only_pages_of_this_run(site, tmp_path):
+    sections = tmp_path / "sections.txt"
+    sections.write_text("novedades\n", encoding="utf-8")
+    output_dir = tmp_path / "out"
+    (output_dir / "html").mkdir(parents=True)
+    (output_dir / "html" / "old-run.html").write_text("<div id='news-body'>Vieja</div>", encoding="utf-8")
+
+    report = engine_crawl(max_links=10, output_dir=output_dir, base_url=site, sections_file=sections)
+
+    assert report["extracted"] == 3
+    records = (output_dir / "contenido.jsonl").read_text(encoding="utf-8").splitlines()
+    assert all("old-run" not in record for record in records)
+    assert len(records) == 3
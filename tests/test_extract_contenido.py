@@ -1,5 +1,7 @@
 from pathlib import Path
 
+import pytest
+
 from extract_contenido import extract_text
 
 
@@ -29,3 +31,168 @@ def test_extract_sample() -> None:
     )
     assert combined == expected
     assert result.date == "Martes 12 de Agosto de 2025"
+
+
+def test_main_process_executor_matches_thread(tmp_path) -> None:
+    from extract_contenido import main
+
+    sample = Path(__file__).with_name('data').joinpath('sample_contenido.html').read_text(encoding='utf-8')
+    in_dir = tmp_path / 'in'
+    in_dir.mkdir()
+    for idx in range(5):
+        (in_dir / f'page{idx}.html').write_text(sample, encoding='utf-8')
+    (in_dir / 'other.html').write_text('<html><body><div>Solo texto</div></body></html>', encoding='utf-8')
+
+    outputs = {}
+    for executor in ('thread', 'process'):
+        out_file = tmp_path / f'{executor}.jsonl'
+        main([
+            '--in', str(in_dir), '--out-file', str(out_file), '--format', 'jsonl',
+            '--workers', '2', '--executor', executor, '--chunksize', '2', '--order', 'path',
+        ])
+        outputs[executor] = out_file.read_text(encoding='utf-8')
+
+    assert outputs['process'] == outputs['thread']
+    assert len(outputs['process'].splitlines()) == 6
+
+
+def test_result_writer_merges_spilled_runs(tmp_path) -> None:
+    from extract_contenido import ExtractResult, ResultWriter
+
+    names = ['d', 'b', 'e', 'a', 'c']
+    out_file = tmp_path / 'out.txt'
+    with ResultWriter(out_file, 'txt', order='path', run_size=2) as writer:
+        for name in names:
+            writer.write(Path(name), ExtractResult(title=name.upper(), date=None, text=f'text {name}', used_fallback='contenido'))
+
+    expected = '\n\n'.join(f'{n.upper()}\n\ntext {n}' for n in sorted(names))
+    assert out_file.read_text(encoding='utf-8') == expected
+    assert [p.name for p in tmp_path.iterdir()] == ['out.txt']
+
+
+def test_result_writer_completion_order_flushes_each_record(tmp_path) -> None:
+    import json
+
+    from extract_contenido import ExtractResult, ResultWriter
+
+    out_file = tmp_path / 'out.jsonl'
+    writer = ResultWriter(out_file, 'jsonl', order='completion')
+    writer.write(Path('z'), ExtractResult(title=None, date=None, text='first', used_fallback='largest'))
+    assert json.loads(out_file.read_text(encoding='utf-8'))['text'] == 'first'
+    writer.write(Path('a'), ExtractResult(title=None, date=None, text='second', used_fallback='largest'))
+    writer.close()
+    lines = out_file.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['file'] for line in lines] == ['z', 'a']
+
+
+def test_output_is_streamed_by_default(tmp_path) -> None:
+    from extract_contenido import ResultWriter, parse_args
+
+    assert parse_args(['--in', 'x', '--out-file', 'y']).order == 'completion'
+    with ResultWriter(tmp_path / 'out.txt', 'txt') as writer:
+        assert writer.order == 'completion'
+
+
+def test_manifest_skips_unchanged_files(tmp_path, monkeypatch) -> None:
+    import extract_contenido
+
+    in_dir = tmp_path / 'in'
+    in_dir.mkdir()
+    (in_dir / 'a.html').write_text('<div id="news-body">Uno</div>', encoding='utf-8')
+    (in_dir / 'b.html').write_text('<div id="news-body">Dos</div>', encoding='utf-8')
+    manifest = tmp_path / 'manifest.jsonl'
+    out_file = tmp_path / 'out.txt'
+    argv = [
+        '--in', str(in_dir), '--out-file', str(out_file), '--workers', '1', '--manifest', str(manifest),
+        '--order', 'path',
+    ]
+
+    extract_contenido.main(argv)
+    assert out_file.read_text(encoding='utf-8') == 'Uno\n\nDos'
+
+    calls = []
+    original = extract_contenido.extract_text
+
+    def counting_extract(html):
+        calls.append(html)
+        return original(html)
+
+    monkeypatch.setattr(extract_contenido, 'extract_text', counting_extract)
+    extract_contenido.main(argv)
+    assert calls == []
+    assert out_file.read_text(encoding='utf-8') == 'Uno\n\nDos'
+
+    (in_dir / 'b.html').write_text('<div id="news-body">Dos cambiado</div>', encoding='utf-8')
+    extract_contenido.main(argv)
+    assert len(calls) == 1
+    assert out_file.read_text(encoding='utf-8') == 'Uno\n\nDos cambiado'
+
+
+def test_manifest_ignores_entries_of_other_extractor_versions(tmp_path, monkeypatch) -> None:
+    import extract_contenido
+
+    in_dir = tmp_path / 'in'
+    in_dir.mkdir()
+    (in_dir / 'a.html').write_text('<div id="news-body">Uno</div>', encoding='utf-8')
+    argv = [
+        '--in', str(in_dir), '--out-file', str(tmp_path / 'out.txt'), '--workers', '1',
+        '--manifest', str(tmp_path / 'manifest.jsonl'),
+    ]
+    extract_contenido.main(argv)
+
+    calls = []
+    original = extract_contenido.extract_text
+    monkeypatch.setattr(extract_contenido, 'extract_text', lambda html: calls.append(html) or original(html))
+    monkeypatch.setattr(extract_contenido, 'EXTRACTOR_VERSION', extract_contenido.EXTRACTOR_VERSION + 1)
+    extract_contenido.main(argv)
+    assert len(calls) == 1
+    extract_contenido.main(argv)
+    assert len(calls) == 1
+
+
+REGION_CASES = [
+    '<table class="contenido"><tr><td><div class="novedadespop_titulo">T<br>x</div>'
+    '<table role="presentation"><tr><td><p>Hi<br>there</p><ul><li>a</li><li>b</li></ul></td></tr></table></td></tr></table>',
+    '<table class="contenido"><tr><td><table role="presentation"><tr><td>outer'
+    '<table role="presentation"><tr><td>inner</td></tr></table></td></tr></table></td></tr></table>',
+    '<div id="news-body"><nav><div class="novedadespop_titulo">hidden</div></nav>'
+    '<h2 class="novedadespop_titulo">Visible <b>title</b></h2><script>x()</script><!-- note --><p>Body</p></div>',
+    '<div id="news-body"><header><table role="presentation"><tr><td>skip</td></tr></table></header>'
+    '<p>kept<br class="novedadespop_titulo">line</p><footer>f</footer></div>',
+    '<html><body><main><section><h1>Old page</h1><p>one</p><div>two<span>three</span></div></section></main></body></html>',
+    '<div class="novedadespop_mensaje"><p class="novedadespop_titulo extra">A</p>'
+    '<p class="novedadespop_titulo">B</p><table role="presentation" class="novedadespop_titulo"><tr><td>C</td></tr></table></div>',
+]
+
+
+@pytest.mark.parametrize('features', ['lxml', 'html.parser'])
+@pytest.mark.parametrize('html', REGION_CASES)
+def test_render_region_matches_copying_extraction(html, features) -> None:
+    from bs4 import BeautifulSoup
+
+    from extract_contenido import extract_from_region, find_target_region, render_region
+
+    soup = BeautifulSoup(html, features)
+    region, _ = find_target_region(soup)
+    before = str(soup)
+    assert render_region(region) == extract_from_region(region)
+    assert str(soup) == before
+
+
+@pytest.mark.parametrize('html', [
+    '<html><body><div><section><p>short</p></section><article><p>much longer text here</p>'
+    '<script>ignored ignored ignored ignored</script></article></div><div>tiny</div></body></html>',
+    '<div><div><div>same</div></div></div><table><tr><td>same</td></tr></table>',
+    '<main>  </main><!-- only a comment -->',
+])
+def test_largest_fallback_matches_get_text_scan(html) -> None:
+    from bs4 import BeautifulSoup
+
+    from extract_contenido import find_target_region
+
+    soup = BeautifulSoup(html, 'lxml')
+    candidates = soup.find_all(['div', 'table', 'section', 'article', 'main', 'body'])
+    expected = max(candidates, key=lambda t: len(t.get_text(' ', strip=True)))
+    region, fallback = find_target_region(soup)
+    assert fallback == 'largest'
+    assert region is expected
@@ -0,0 +1,67 @@
+import requests
+
+from crawler.httpcache import CachingSession
+from crawler.network import crawl as network_crawl
+
+
+def make_response(url, status, body=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = url
+    response.encoding = "utf-8"
+    return response
+
+
+class RevalidatingSession:
+    def __init__(self):
+        self.body = b"<p>v1</p>"
+        self.etag = '"1"'
+        self.requests = []
+        self.cookies = {"id": "x"}
+
+    def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.requests.append(headers)
+        if headers.get("If-None-Match") == self.etag:
+            return make_response(url, 304, headers={"ETag": self.etag})
+        return make_response(url, 200, self.body, {"ETag": self.etag, "Content-Type": "text/html"})
+
+
+def test_caching_session_serves_not_modified_from_disk(tmp_path):
+    inner = RevalidatingSession()
+    session = CachingSession(inner, tmp_path / "cache")
+    url = "http://example.com/page"
+
+    assert session.get(url).text == "<p>v1</p>"
+    second = session.get(url)
+    assert second.status_code == 200
+    assert second.text == "<p>v1</p>"
+    assert second.headers["Content-Type"] == "text/html"
+    assert inner.requests[1] == {"If-None-Match": '"1"'}
+    assert (session.cache.hits, session.cache.misses) == (1, 1)
+
+    inner.body, inner.etag = b"<p>v2</p>", '"2"'
+    assert session.get(url).text == "<p>v2</p>"
+    assert session.get(url).text == "<p>v2</p>"
+    assert session.cookies == {"id": "x"}
+
+
+def test_network_crawl_uses_caching_session(tmp_path, monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda x: None)
+    inner = RevalidatingSession()
+    session = CachingSession(inner, tmp_path / "cache")
+    assert network_crawl(session, "http://example.com/a") == "<p>v1</p>"
+    assert network_crawl(session, "http://example.com/a") == "<p>v1</p>"
+    assert session.cache.hits == 1
+
+
+def test_responses_without_validators_are_not_cached(tmp_path):
+    class PlainSession:
+        def get(self, url, headers=None, **kwargs):
+            return make_response(url, 200, b"plain")
+
+    session = CachingSession(PlainSession(), tmp_path / "cache")
+    session.get("http://example.com/plain")
+    assert list((tmp_path / "cache").iterdir()) == []
@@ -1,7 +1,12 @@
-from crawler.parser import extract_text
+from pathlib import Path
 
+import pytest
 
-def test_extract_text_cleans_html():
+from crawler.parser import BACKENDS, DEFAULT_BACKEND, extract_text, parse_document
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_extract_text_cleans_html(backend):
     html = (
         "<html><body>"
         "<nav class='menu'><a href='/'>Home</a></nav>"
@@ -12,5 +17,52 @@ def test_extract_text_cleans_html():
         "<img src='img.png'/>"
         "</body></html>"
     )
-    text = extract_text(html)
+    text = extract_text(html, backend=backend)
     assert text == "Title Paragraph link"
+
+
+def test_backends_agree_on_fixtures():
+    html = Path(__file__).with_name("data").joinpath("sample_contenido.html").read_text(encoding="utf-8")
+    extra = (
+        "<div class='x sidebar'>menu</div><a class='nav' href='#'>kept</a>"
+        "<p>a&amp;b<!-- c -->d</p><template>hidden</template>"
+    )
+    for doc in (html, html + extra, html + html):
+        assert extract_text(doc, backend="lxml") == extract_text(doc, backend="html.parser")
+
+
+def test_backends_differ_on_misnested_markup():
+    pytest.importorskip("lxml")
+    html = "<p class='menu'>menu<div>body text</div>tail</p>"
+    # html.parser keeps the <div> inside the menu paragraph; lxml closes the
+    # paragraph before the <div>, so its text survives.
+    assert DEFAULT_BACKEND == "html.parser"
+    assert extract_text(html) == extract_text(html, backend="html.parser") == ""
+    assert extract_text(html, backend="lxml") == "body text tail"
+
+
+def test_extract_text_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        extract_text("<p>x</p>", backend="nope")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_parse_document_collects_title_text_and_links(backend):
+    html = (
+        "<html><head><title>Novedades</title></head><body>"
+        "<nav class='menu'><a href='/inicio'>Inicio</a></nav>"
+        "<p>Texto <a href='nota?id=1'>nota</a></p><a name='ancla'>sin href</a>"
+        "</body></html>"
+    )
+    document = parse_document(html, backend=backend)
+    assert document.title == "Novedades"
+    assert document.text == "Novedades Texto nota sin href"
+    assert document.links == ["/inicio", "nota?id=1"]
+
+
+def test_parse_content_uses_single_parse():
+    from ss_canton_crawler.parser import parse_content
+
+    data = parse_content("<html><head><title>T</title></head><body><p>Hola</p></body></html>")
+    assert data == {"title": "T", "text": "T Hola"}
+    assert parse_content("<p>Sin titulo</p>")["title"] == ""
@@ -0,0 +1,78 @@
+import pytest
+import requests
+
+from crawler.ratelimit import RateController, TokenBucket, is_overload_error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    clock.now = 10.0
+    assert bucket.reserve() == 0
+
+
+def test_rate_controller_aimd():
+    clock = FakeClock()
+    rate = RateController(
+        rate=100, burst=100, max_concurrency=8, initial_concurrency=4,
+        slow_threshold=1.0, clock=clock, sleep=clock.sleep,
+    )
+    url = "http://example.com/page"
+    for _ in range(4):
+        started = rate.acquire(url)
+        clock.now += 0.1
+        rate.release(url, started, ok=True)
+    assert rate.limit(url) == 4
+    for _ in range(8):
+        started = rate.acquire(url)
+        rate.release(url, started, ok=True)
+    assert rate.limit(url) == 6
+
+    started = rate.acquire(url)
+    rate.release(url, started, ok=False)
+    assert rate.limit(url) == 3
+    # A second failure within the same window does not cut again.
+    started = rate.acquire(url)
+    rate.release(url, started, ok=False)
+    assert rate.limit(url) == 3
+
+    clock.now += 5
+    started = rate.acquire(url)
+    clock.now += 2
+    rate.release(url, started, ok=True)
+    assert rate.limit(url) == 1
+    assert rate.limit("http://other.example.com/") == 4
+
+
+def test_is_overload_error():
+    def http_error(status):
+        response = requests.Response()
+        response.status_code = status
+        return requests.HTTPError(response=response)
+
+    assert is_overload_error(http_error(503))
+    assert is_overload_error(http_error(429))
+    assert not is_overload_error(http_error(404))
+    assert is_overload_error(requests.ConnectionError())
+    assert is_overload_error(requests.ReadTimeout())
+
+
+def test_is_overload_error_ignores_other_errors():
+    assert not is_overload_error(requests.HTTPError())
+    assert not is_overload_error(requests.TooManyRedirects())
+    assert not is_overload_error(ValueError("bad markup"))
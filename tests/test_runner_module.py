@@ -30,10 +30,10 @@ def test_crawl_enqueues_links_respecting_max(tmp_path):
     html = "<a href='p1'></a><a href='p2'></a>"
     session = DummySession(html)
     visited = {"http://example.com/start"}
-    q: "Queue[tuple[str, str]]" = Queue()
+    q: "Queue[tuple[str, str, int]]" = Queue()
     lock = threading.Lock()
     runner_crawl(session, "http://example.com/start", "sec", 2, visited, q, lock)
-    assert q.get_nowait() == ("http://example.com/p1", "sec")
+    assert q.get_nowait() == ("http://example.com/p1", "sec", 1)
     assert q.empty()
     assert visited == {"http://example.com/start", "http://example.com/p1"}
 
@@ -44,8 +44,108 @@ def test_crawl_handles_request_errors(tmp_path):
             raise Exception("boom")
 
     visited = set()
-    q: "Queue[tuple[str, str]]" = Queue()
+    q: "Queue[tuple[str, str, int]]" = Queue()
     lock = threading.Lock()
     runner_crawl(ErrorSession(), "http://example.com", "sec", None, visited, q, lock)
     assert q.empty()
     assert visited == set()
+
+
+def test_crawl_persists_page_from_single_parse(tmp_path):
+    from crawler.runner import page_stem
+
+    html = "<html><head><title>T</title></head><body><p>Hola</p><a href='p1'>uno</a></body></html>"
+    q: "Queue[tuple[str, str, int]]" = Queue()
+    visited = {"http://example.com/start"}
+    runner_crawl(
+        DummySession(html), "http://example.com/start", "novedades/lista", None,
+        visited, q, threading.Lock(), output_dir=tmp_path,
+    )
+    stem = page_stem("http://example.com/start", "novedades/lista")
+    assert stem.startswith("novedades_lista-")
+    assert (tmp_path / "html" / f"{stem}.html").read_text(encoding="utf-8") == html
+    assert (tmp_path / "textos" / f"{stem}.txt").read_text(encoding="utf-8") == "T Hola uno"
+    assert q.get_nowait() == ("http://example.com/p1", "novedades/lista", 1)
+
+
+def test_run_keeps_all_workers_busy_after_slow_page(tmp_path):
+    import time
+
+    from crawler.runner import run
+
+    threads = set()
+
+    class SlowStartSession:
+        def get(self, url: str) -> DummyResponse:
+            if url.endswith("/start"):
+                time.sleep(0.3)
+                return DummyResponse("".join(f"<a href='p{i}'></a>" for i in range(8)))
+            threads.add(threading.get_ident())
+            time.sleep(0.05)
+            return DummyResponse("")
+
+    sections = tmp_path / "sections.txt"
+    sections.write_text("start\n", encoding="utf-8")
+    run("http://example.com/", str(sections), max_workers=4, session=SlowStartSession())
+    assert len(threads) > 1
+
+
+def test_crawl_reports_server_errors_to_rate_controller(caplog):
+    import requests
+
+    from crawler.ratelimit import RateController
+
+    class UnavailableSession:
+        def get(self, url: str):
+            response = requests.Response()
+            response.status_code = 503
+            response.url = url
+            return response
+
+    rate = RateController(rate=100, burst=100, max_concurrency=8)
+    q: "Queue[tuple[str, str, int]]" = Queue()
+    runner_crawl(UnavailableSession(), "http://example.com/x", "sec", None, set(), q, threading.Lock(), rate=rate)
+    assert rate.limit("http://example.com/x") == 4
+    assert "Failed to fetch http://example.com/x" in caplog.text
+    assert q.empty()
+
+
+def test_run_skips_urls_differing_only_in_canonical_form(tmp_path):
+    from crawler.runner import run
+
+    fetched = []
+
+    class RecordingSession:
+        def get(self, url: str) -> DummyResponse:
+            fetched.append(url)
+            if url.endswith("/start"):
+                return DummyResponse(
+                    "<a href='p?a=1&b=2'></a><a href='p?b=2&a=1'></a>"
+                    "<a href='p?a=1&b=2#top'></a><a href='dir/'></a><a href='dir'></a>"
+                )
+            return DummyResponse("")
+
+    sections = tmp_path / "sections.txt"
+    sections.write_text("start\n", encoding="utf-8")
+    run("http://example.com/", str(sections), max_workers=2, session=RecordingSession())
+    assert sorted(fetched) == [
+        "http://example.com/dir/", "http://example.com/p?a=1&b=2", "http://example.com/start",
+    ]
+
+
+def test_run_with_rate_controller_disables_adapter_retries(tmp_path, monkeypatch):
+    from crawler import runner
+    from crawler.ratelimit import RateController
+
+    created = []
+
+    def fake_make_session(max_workers, **options):
+        created.append(options)
+        return DummySession("")
+
+    monkeypatch.setattr(runner, "make_session", fake_make_session)
+    sections = tmp_path / "sections.txt"
+    sections.write_text("start\n", encoding="utf-8")
+    runner.run("http://example.com/", str(sections), max_workers=2)
+    runner.run("http://example.com/", str(sections), max_workers=2, rate=RateController(rate=100, burst=100))
+    assert created == [{}, {"retries": 0}]
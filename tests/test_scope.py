@@ -0,0 +1,74 @@
+from queue import Queue
+import threading
+
+import pytest
+
+from crawler.runner import crawl
+from crawler.sections import load_section_depths, load_sections
+from crawler.scope import LinkFilter
+
+
+@pytest.mark.parametrize("url, allowed", [
+    ("https://site.example/novedades/detalle.php?id=3", True),
+    ("https://other.example/novedades", False),
+    ("mailto:admin@site.example", False),
+    ("javascript:void(0)", False),
+    ("https://site.example/archivos/informe.PDF", False),
+    ("https://site.example/logout.php", False),
+    ("https://site.example/index.php?accion=salir", False),
+    ("https://site.example/novedades/salir-de-paseo-en-familia", True),
+    ("https://site.example/admin/config", False),
+])
+def test_link_filter_rules(url, allowed):
+    link_filter = LinkFilter(allow_hosts=["site.example"], deny_prefixes=["/admin"])
+    assert link_filter.allows(url) is allowed
+
+
+def test_link_filter_patterns_and_depths():
+    link_filter = LinkFilter(
+        allow_patterns=[r"/novedades/"], max_depth=2, section_depths={"galeria": 0},
+    )
+    assert link_filter.allows("http://x/novedades/1", "inicio", 2)
+    assert not link_filter.allows("http://x/novedades/1", "inicio", 3)
+    assert not link_filter.allows("http://x/otros/1", "inicio", 1)
+    assert not link_filter.allows("http://x/novedades/1", "galeria", 1)
+
+
+def test_sections_file_depths(tmp_path):
+    sections = tmp_path / "sections.txt"
+    sections.write_text("novedades 2\n\ngaleria\n", encoding="utf-8")
+    assert load_sections(str(sections)) == ["novedades", "galeria"]
+    assert load_section_depths(str(sections)) == {"novedades": 2}
+    link_filter = LinkFilter.for_site("https://site.example/elcanton/", str(sections))
+    assert link_filter.allow_hosts == {"site.example"}
+    assert link_filter.section_depths == {"novedades": 2}
+
+
+def test_sections_file_paths_with_spaces(tmp_path):
+    sections = tmp_path / "sections.txt"
+    sections.write_text("fotos del club\nactas 2024 3\nnotas v2\n", encoding="utf-8")
+    assert load_sections(str(sections)) == ["fotos del club", "actas 2024", "notas v2"]
+    assert load_section_depths(str(sections)) == {"actas 2024": 3}
+
+
+def test_crawl_applies_filter_before_enqueueing():
+    class Response:
+        text = (
+            "<a href='nota?id=1'></a><a href='mailto:x@y'></a>"
+            "<a href='https://elsewhere.example/'></a><a href='adjunto.pdf'></a>"
+        )
+
+        def raise_for_status(self):
+            pass
+
+    class Session:
+        def get(self, url):
+            return Response()
+
+    q = Queue()
+    visited = set()
+    link_filter = LinkFilter.for_site("http://site.example/")
+    crawl(Session(), "http://site.example/sec", "sec", None, visited, q, threading.Lock(),
+          link_filter=link_filter, depth=1)
+    assert q.get_nowait() == ("http://site.example/nota?id=1", "sec", 2)
+    assert q.empty()
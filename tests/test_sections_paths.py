@@ -4,7 +4,7 @@ import os
 from ss_canton_crawler import runner
 
 
-def _dummy_login(user, password, base_url):
+def _dummy_login(user, password, base_url, **kwargs):
     return object()
 
 
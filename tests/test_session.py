@@ -0,0 +1,105 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+from crawler import network, utils
+from crawler.session import DEFAULT_TIMEOUT, make_session
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits = {}
+    connections = set()
+
+    def do_GET(self):
+        Handler.connections.add(self.client_address)
+        count = Handler.hits.get(self.path, 0) + 1
+        Handler.hits[self.path] = count
+        if self.path == "/down":
+            self._reply(503, b"down")
+        elif self.path == "/flaky" and count < 3:
+            self._reply(503, b"busy", {"Retry-After": "0"})
+        elif self.path == "/slow":
+            time.sleep(0.5)
+            self._reply(200, b"late")
+        else:
+            self._reply(200, b"ok")
+
+    def _reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(local_server):
+    Handler.hits = {}
+    Handler.connections = set()
+    return local_server(Handler)
+
+
+def test_pool_sized_from_workers():
+    session = make_session(32)
+    adapter = session.get_adapter("https://example.com")
+    assert adapter._pool_maxsize == 32
+    assert adapter.timeout == DEFAULT_TIMEOUT
+    assert make_session(2).get_adapter("http://example.com")._pool_maxsize == 10
+
+
+def test_connections_are_reused_across_workers(server):
+    workers = 16
+    session = make_session(workers)
+    barrier = threading.Barrier(workers)
+
+    def fetch():
+        for _ in range(5):
+            barrier.wait()
+            assert session.get(server + "/page").text == "ok"
+
+    threads = [threading.Thread(target=fetch) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert Handler.hits["/page"] == workers * 5
+    assert len(Handler.connections) <= workers
+
+
+def test_retries_transient_errors(server):
+    session = make_session(backoff_factor=0)
+    response = session.get(server + "/flaky")
+    assert response.status_code == 200
+    assert Handler.hits["/flaky"] == 3
+
+
+def test_retries_can_be_disabled(server):
+    session = make_session(retries=0)
+    assert session.get(server + "/flaky").status_code == 503
+    assert Handler.hits["/flaky"] == 1
+
+
+def test_default_timeout_applies(server):
+    session = make_session(timeout=0.1, retries=0)
+    with pytest.raises(requests.Timeout):
+        session.get(server + "/slow")
+    assert session.get(server + "/slow", timeout=2).text == "late"
+
+
+def test_keep_alive_can_be_disabled():
+    assert make_session(keep_alive=False).headers["Connection"] == "close"
+
+
+def test_network_helpers_retry_in_one_layer(server, monkeypatch):
+    monkeypatch.setattr(utils.time, "sleep", lambda seconds: None)
+    with pytest.raises(requests.HTTPError):
+        network.crawl(make_session(retries=0), server + "/down")
+    assert Handler.hits["/down"] == network.TRIES
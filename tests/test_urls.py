@@ -0,0 +1,36 @@
+import pytest
+
+from crawler.urls import SEEN_SET_KINDS, canonicalize_url, make_seen_set, url_fingerprint
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTP://Example.COM:80/a/?b=2&a=1#frag", "http://example.com/a?a=1&b=2"),
+    ("https://example.com:443", "https://example.com/"),
+    ("https://example.com:8443/x//", "https://example.com:8443/x"),
+    ("http://user:pw@Example.com/p?z=&a=1", "http://user:pw@example.com/p?a=1&z="),
+    ("http://[::1]:8080/p/", "http://[::1]:8080/p"),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_fingerprint_ignores_non_canonical_differences():
+    assert url_fingerprint("http://example.com/a?x=1&y=2") == url_fingerprint("http://EXAMPLE.com/a/?y=2&x=1#top")
+    assert url_fingerprint("http://example.com/a") != url_fingerprint("http://example.com/b")
+
+
+@pytest.mark.parametrize("kind", SEEN_SET_KINDS)
+def test_seen_sets_deduplicate_canonical_urls(kind):
+    seen = make_seen_set(kind, ["http://example.com/start"], capacity=1000)
+    assert "http://example.com/start/#x" in seen
+    assert "http://example.com/other" not in seen
+    for i in range(500):
+        seen.add(f"http://example.com/p?id={i}&lang=es")
+        seen.add(f"http://example.com/p?lang=es&id={i}#f")
+    assert len(seen) == 501
+    assert all(f"http://example.com/p?id={i}&lang=es" in seen for i in range(500))
+
+
+def test_make_seen_set_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        make_seen_set("nope")
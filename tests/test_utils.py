@@ -1,6 +1,10 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
 import pytest
+import requests
 
-from crawler.utils import retry
+from crawler.utils import RetryStats, retry, retry_after
 
 
 def test_retry_eventually_succeeds(monkeypatch):
@@ -26,3 +30,94 @@ def test_retry_raises_after_exhausting(monkeypatch):
     monkeypatch.setattr("time.sleep", lambda x: None)
     with pytest.raises(RuntimeError):
         always_fail()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr("time.monotonic", fake.monotonic)
+    monkeypatch.setattr("time.sleep", fake.sleep)
+    return fake
+
+
+def test_retry_jitter_stays_within_backoff(clock):
+    @retry((ValueError,), tries=6, base_delay=1, jitter=0.5, stats=RetryStats())
+    def always_fail():
+        raise ValueError("fail")
+
+    with pytest.raises(ValueError):
+        always_fail()
+    for sleep, delay in zip(clock.sleeps, [1, 2, 4, 8, 16]):
+        assert delay / 2 <= sleep <= delay
+    assert len(set(clock.sleeps)) == 5
+
+
+def test_retry_respects_budget(clock):
+    stats = RetryStats()
+
+    @retry((ValueError,), tries=10, base_delay=1, jitter=0, budget=10, stats=stats)
+    def always_fail():
+        clock.now += 1
+        raise ValueError("fail")
+
+    with pytest.raises(ValueError):
+        always_fail()
+    assert clock.sleeps == [1, 2]
+    assert stats.snapshot() == {"calls": 3, "retries": 2, "timeouts": 0, "failures": 1}
+
+
+def test_retry_honours_retry_after(clock):
+    response = requests.Response()
+    response.status_code = 503
+    response.headers["Retry-After"] = "7"
+    calls = []
+
+    @retry((requests.HTTPError,), tries=2, base_delay=1, jitter=0, stats=RetryStats())
+    def busy():
+        calls.append(1)
+        if len(calls) == 1:
+            raise requests.HTTPError(response=response)
+        return "ok"
+
+    assert busy() == "ok"
+    assert clock.sleeps == [7]
+
+
+def test_retry_after_http_date():
+    response = requests.Response()
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    response.headers["Retry-After"] = format_datetime(when, usegmt=True)
+    assert 25 <= retry_after(requests.HTTPError(response=response)) <= 30
+    assert retry_after(ValueError()) is None
+
+
+def test_retry_passes_timeout_and_counts_timeouts(clock):
+    stats = RetryStats()
+    seen = []
+
+    @retry((requests.Timeout,), tries=2, base_delay=0, timeout=(3, 20), budget=10, stats=stats)
+    def fetch(timeout=None):
+        seen.append(timeout)
+        clock.now += 8
+        raise requests.Timeout()
+
+    with pytest.raises(requests.Timeout):
+        fetch()
+    assert seen == [(3, 10), (2, 2)]
+    assert stats.snapshot()["timeouts"] == 2
+    with pytest.raises(requests.Timeout):
+        fetch(timeout=1)
+    assert seen[-1] == 1